@@ -0,0 +1,45 @@
+"""Benchmark encode/decode speed and size of the storage codecs."""
+import timeit
+from src.storage import CODECS
+
+RECORDS = 20000
+REPEAT = 5
+
+
+def _sample_data(count):
+    """Build reservation-shaped records for benchmarking."""
+    return [
+        {
+            "id": f"{i:08d}-0000-4000-8000-000000000000",
+            "hotel_id": f"{i % 50:08d}-0000-4000-8000-000000000000",
+            "customer_id": f"{i % 997:08d}-0000-4000-8000-000000000000",
+            "check_in": "2026-03-01",
+            "check_out": "2026-03-05",
+            "room": str(100 + i % 400),
+            "status": "active" if i % 7 else "cancelled",
+        }
+        for i in range(count)
+    ]
+
+
+def main():
+    """Run the benchmark and print a table."""
+    data = _sample_data(RECORDS)
+    print(f"{RECORDS} records, best of {REPEAT} runs")
+    print(f"{'codec':<12}{'encode ms':>12}{'decode ms':>12}{'bytes':>12}")
+    for name, codec in CODECS.items():
+        raw = codec.encode(data)
+        encode = min(timeit.repeat(
+            lambda c=codec: c.encode(data), number=1, repeat=REPEAT
+        ))
+        decode = min(timeit.repeat(
+            lambda c=codec, r=raw: c.decode(r), number=1, repeat=REPEAT
+        ))
+        print(
+            f"{name:<12}{encode * 1000:>12.1f}"
+            f"{decode * 1000:>12.1f}{len(raw):>12}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+"""Offline tool that merges duplicate customers and fixes reservations."""
+from src.customer import Customer
+from src.reservation import Reservation
+
+
+def main():
+    """Repoint reservations of duplicate customers, then merge them."""
+    duplicates = Customer.find_duplicates()
+    rewritten = Reservation.reassign_customers(duplicates)
+    merged = Customer.merge_duplicates(duplicates)
+    print(f"Merged customers:       {len(merged)}")
+    print(f"Rewritten reservations: {rewritten}")
+
+
+if __name__ == "__main__":
+    main()
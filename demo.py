@@ -3,14 +3,15 @@ import glob
 import os
 from src.hotel import Hotel
 from src.customer import Customer
-from src.storage import DATA_DIR
+from src.storage import data_dir
 from src.reservation import BookingInfo, Reservation
 
 
 def _clean_data():
     """Remove all JSON data files to start fresh."""
-    os.makedirs(DATA_DIR, exist_ok=True)
-    for filepath in glob.glob(os.path.join(DATA_DIR, '*.json')):
+    os.makedirs(data_dir(), exist_ok=True)
+    pattern = os.path.join(data_dir(), '**', '*.json')
+    for filepath in glob.glob(pattern, recursive=True):
         os.remove(filepath)
 
 
@@ -0,0 +1,282 @@
+"""Concurrent booking load generator with latency histograms."""
+import argparse
+import glob
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date, timedelta
+from functools import partial
+from src.customer import Customer
+from src.hotel import Hotel
+from src.reservation import BookingInfo, Reservation
+from src.storage import data_dir
+
+OPERATIONS = ('create', 'lookup', 'cancel')
+# Nights per stay and their relative frequency.
+STAY_WEIGHTS = {1: 30, 2: 25, 3: 18, 4: 10, 5: 7, 6: 5, 7: 5}
+PERCENTILES = (50.0, 75.0, 90.0, 99.0, 99.9, 100.0)
+
+
+class LatencyHistogram:
+    """
+    Log-linear latency histogram in the style of HdrHistogram.
+
+    Values are recorded in microseconds into buckets with 32 linear
+    steps per power of two, bounding the error to about 3%.
+    """
+
+    SUB_BUCKETS = 32
+
+    def __init__(self):
+        """Initialize an empty histogram."""
+        self.counts = {}
+        self.total = 0
+        self.max = 0
+
+    @classmethod
+    def _index(cls, micros):
+        """Return the bucket index for a value in microseconds."""
+        if micros < 2 * cls.SUB_BUCKETS:
+            return micros
+        shift = micros.bit_length() - cls.SUB_BUCKETS.bit_length()
+        return cls.SUB_BUCKETS * (shift + 1) + (micros >> shift)
+
+    @classmethod
+    def _value(cls, index):
+        """Return the highest value in microseconds stored in a bucket."""
+        if index < 2 * cls.SUB_BUCKETS:
+            return index
+        shift = index // cls.SUB_BUCKETS - 2
+        steps = index % cls.SUB_BUCKETS + cls.SUB_BUCKETS
+        return ((steps + 1) << shift) - 1
+
+    def record(self, seconds):
+        """Record one latency measured in seconds."""
+        micros = max(0, int(seconds * 1_000_000))
+        index = self._index(micros)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.total += 1
+        self.max = max(self.max, micros)
+
+    def merge(self, other):
+        """Add the recordings of another histogram to this one."""
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, percent):
+        """Return the latency in microseconds at a percentile."""
+        if not self.total:
+            return 0
+        target = max(1, round(self.total * percent / 100))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(self._value(index), self.max)
+        return self.max
+
+
+class OperationStats:
+    """Outcome counters and latency histogram for one operation type."""
+
+    def __init__(self):
+        """Initialize empty counters."""
+        self.ok = 0
+        self.conflicts = 0
+        self.errors = 0
+        self.latency = LatencyHistogram()
+
+    def record(self, outcome, seconds):
+        """Count one 'ok', 'conflicts' or 'errors' outcome and its latency."""
+        setattr(self, outcome, getattr(self, outcome) + 1)
+        self.latency.record(seconds)
+
+    def merge(self, other):
+        """Add the counters of another OperationStats to this one."""
+        self.ok += other.ok
+        self.conflicts += other.conflicts
+        self.errors += other.errors
+        self.latency.merge(other.latency)
+
+
+def _booking_info(rng, rooms, start):
+    """Draw a booking with a realistic lead time and stay length."""
+    lead = min(int(rng.expovariate(1 / 30)), 365)
+    nights = rng.choices(list(STAY_WEIGHTS), list(STAY_WEIGHTS.values()))[0]
+    check_in = start + timedelta(days=lead)
+    return BookingInfo(
+        check_in=check_in.isoformat(),
+        check_out=(check_in + timedelta(days=nights)).isoformat(),
+        room=str(100 + rng.randrange(rooms)),
+    )
+
+
+def _plan_operation(op, rng, context, booked, active):
+    """
+    Draw the arguments for one operation and return it as a callable.
+
+    booked holds every reservation this worker created and active the
+    ones it has not cancelled; a planned cancel removes its reservation
+    from active.
+    """
+    hotels, customers, rooms, start = context
+    if op == 'create':
+        return partial(
+            rng.choice(hotels).reserve_a_room,
+            rng.choice(customers), _booking_info(rng, rooms, start),
+        )
+    if op == 'lookup':
+        reservation = rng.choice(booked)
+        return partial(
+            Reservation.find_by_id,
+            reservation.id, hotel_id=reservation.hotel_id,
+        )
+    return active.pop(rng.randrange(len(active))).cancel_reservation
+
+
+def worker(seed, operations, mix, context):
+    """
+    Run a sequence of random operations and return their statistics.
+
+    Returns a dict of operation name to OperationStats plus the number
+    of reservations this worker created. Cancels only pick reservations
+    the worker has not cancelled yet, so the conflicts counted are the
+    ValueErrors raised by the models, such as unavailable rooms or
+    reservations lost to concurrent writers.
+    """
+    rng = random.Random(seed)
+    stats = {op: OperationStats() for op in OPERATIONS}
+    booked, active = [], []
+    for _ in range(operations):
+        op = rng.choices(OPERATIONS, [mix[o] for o in OPERATIONS])[0]
+        if not booked or (op == 'cancel' and not active):
+            op = 'create'
+        operation = _plan_operation(op, rng, context, booked, active)
+        began = time.perf_counter()
+        try:
+            result = operation()
+            outcome = 'ok'
+        except ValueError:
+            outcome = 'conflicts'
+        except Exception:  # pylint: disable=broad-exception-caught
+            outcome = 'errors'
+        stats[op].record(outcome, time.perf_counter() - began)
+        if op == 'create' and outcome == 'ok':
+            booked.append(result)
+            active.append(result)
+    return stats, len(booked)
+
+
+def _clean_data():
+    """Remove all data files to start from an empty store."""
+    pattern = os.path.join(data_dir(), '**', '*.json')
+    for filepath in glob.glob(pattern, recursive=True):
+        os.remove(filepath)
+
+
+def _parse_mix(text):
+    """Parse 'create=5,lookup=4,cancel=1' into operation weights."""
+    mix = dict.fromkeys(OPERATIONS, 0.0)
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        if name not in mix:
+            raise argparse.ArgumentTypeError(f"Unknown operation {name}")
+        mix[name] = float(weight)
+    return mix
+
+
+def _report(totals, elapsed, created, persisted):
+    """Print throughput, outcome rates and latency percentiles."""
+    count = sum(s.latency.total for s in totals.values())
+    print(f"\n{count} operations in {elapsed:.2f}s "
+          f"({count / elapsed:.0f} ops/s)")
+    header = ''.join(f"{f'p{p:g}':>9}" for p in PERCENTILES)
+    print(f"\n{'op':<8}{'count':>8}{'conflict':>10}{'error':>8}{header}")
+    for op, stats in totals.items():
+        total = stats.latency.total or 1
+        values = ''.join(
+            f"{stats.latency.percentile(p) / 1000:>9.2f}" for p in PERCENTILES
+        )
+        print(
+            f"{op:<8}{stats.latency.total:>8}"
+            f"{stats.conflicts / total:>10.1%}{stats.errors / total:>8.1%}"
+            f"{values}"
+        )
+    print("(latencies in ms)")
+    print(f"\nReservations created: {created}, persisted: {persisted}, "
+          f"lost to concurrent writes: {created - persisted}")
+
+
+def _parse_args():
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--hotels', type=int, default=5)
+    parser.add_argument('--customers', type=int, default=50)
+    parser.add_argument('--rooms', type=int, default=40,
+                        help="rooms per hotel")
+    parser.add_argument('--workers', type=int, default=4,
+                        help="concurrent bookers")
+    parser.add_argument('--mode', choices=('thread', 'process'),
+                        default='thread')
+    parser.add_argument('--operations', type=int, default=200,
+                        help="operations per worker")
+    parser.add_argument('--mix', type=_parse_mix,
+                        default='create=5,lookup=4,cancel=1')
+    parser.add_argument('--seed', type=int, default=0)
+    return parser.parse_args()
+
+
+def _seed(args):
+    """Start from an empty store and return the worker context."""
+    print(f"Cleaning {os.path.normpath(data_dir())} and seeding "
+          f"{args.hotels} hotels, {args.customers} customers")
+    _clean_data()
+    hotels = [Hotel.create(name=f"Hotel {i}") for i in range(args.hotels)]
+    customers = Customer.get_or_create_many(
+        [f"Customer {i}" for i in range(args.customers)]
+    )
+    return (hotels, customers, args.rooms, date.today())
+
+
+def _run_workers(args, context):
+    """Run every worker and return their results and the elapsed time."""
+    executor = (ProcessPoolExecutor if args.mode == 'process'
+                else ThreadPoolExecutor)
+    print(f"Running {args.workers} {args.mode} workers x "
+          f"{args.operations} operations")
+    began = time.perf_counter()
+    with executor(max_workers=args.workers) as pool:
+        futures = [
+            pool.submit(worker, args.seed + i, args.operations,
+                        args.mix, context)
+            for i in range(args.workers)
+        ]
+        results = [f.result() for f in futures]
+    return results, time.perf_counter() - began
+
+
+def _merge_results(results):
+    """Combine worker results into per-operation totals."""
+    totals = {op: OperationStats() for op in OPERATIONS}
+    created = 0
+    for stats, worker_created in results:
+        created += worker_created
+        for op, op_stats in stats.items():
+            totals[op].merge(op_stats)
+    return totals, created
+
+
+def main():
+    """Parse arguments, run the load and print the report."""
+    args = _parse_args()
+    context = _seed(args)
+    results, elapsed = _run_workers(args, context)
+    totals, created = _merge_results(results)
+    _report(totals, elapsed, created, len(Reservation.all()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""Storage backends holding the raw bytes of data files."""
+import contextlib
+import fcntl
+import os
+import tempfile
+import threading
+
+
+def _bisect_lines(line_from, size, predicate):
+    """
+    Return the offset of the first line for which predicate holds.
+
+    line_from(offset) returns the start and bytes of the first line
+    starting at or after offset, with b'' past the end. predicate must
+    be false for a prefix of the lines and true afterwards, so only a
+    logarithmic number of lines is examined.
+    """
+    low, high = 0, size
+    while low < high:
+        middle = (low + high) // 2
+        line = line_from(middle)[1]
+        if not line or predicate(line):
+            high = middle
+        else:
+            low = middle + 1
+    return line_from(low)[0]
+
+
+class FileBackend:
+    """Keeps data files in a directory on disk."""
+
+    def __init__(self, root):
+        """Initialize a backend rooted at directory root."""
+        self.root = root
+        self.cache = {}
+
+    def _path(self, filename):
+        """Return the absolute path of a data file."""
+        return os.path.join(self.root, filename)
+
+    def stamp(self, filename):
+        """Return a value that changes whenever the file changes, or None."""
+        try:
+            stat = os.stat(self._path(filename))
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def read(self, filename):
+        """Return the contents of a data file, or None if missing."""
+        try:
+            with open(self._path(filename), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def write(self, filename, raw):
+        """
+        Replace the contents of a data file, creating directories.
+
+        The new contents are written to a temporary file in the same
+        directory and renamed over the old file, so concurrent readers
+        see either the old or the new contents, never a partial file.
+        """
+        filepath = self._path(filename)
+        directory = os.path.dirname(filepath)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp = tempfile.mkstemp(
+            dir=directory, prefix=f".{os.path.basename(filepath)}.",
+            suffix='.tmp',
+        )
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(raw)
+            os.replace(temp, filepath)
+        except BaseException:
+            os.unlink(temp)
+            raise
+
+    def append(self, filename, raw):
+        """Append raw bytes to a data file, creating it if needed."""
+        filepath = self._path(filename)
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        with open(filepath, 'ab') as f:
+            f.write(raw)
+
+    @contextlib.contextmanager
+    def lock(self, filename):
+        """
+        Hold an exclusive lock on a data file across processes.
+
+        Uses flock(2) on a companion "<filename>.lock" file, which
+        survives write() replacing the data file itself.
+        """
+        filepath = self._path(filename) + '.lock'
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        with open(filepath, 'ab') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def iter_lines(self, filename, start=0):
+        """Lazily yield the lines of a data file from byte offset start."""
+        try:
+            f = open(self._path(filename), 'rb')
+        except FileNotFoundError:
+            return
+        with f:
+            f.seek(start)
+            yield from f
+
+    def find_line(self, filename, predicate):
+        """
+        Return the offset of the first line for which predicate holds.
+
+        See _bisect_lines(); returns the file size if there is none.
+        """
+        try:
+            f = open(self._path(filename), 'rb')
+        except FileNotFoundError:
+            return 0
+        with f:
+            def line_from(offset):
+                f.seek(max(0, offset - 1))
+                if offset:
+                    f.readline()
+                return f.tell(), f.readline()
+            return _bisect_lines(line_from, f.seek(0, os.SEEK_END),
+                                 predicate)
+
+    def last_line(self, filename, chunk_size=4096):
+        """
+        Return the last non-empty line of a data file, or None.
+
+        Reads backwards from the end of the file, so the cost does not
+        grow with the file size.
+        """
+        try:
+            f = open(self._path(filename), 'rb')
+        except FileNotFoundError:
+            return None
+        with f:
+            end = f.seek(0, os.SEEK_END)
+            tail = b''
+            while end > 0 and tail.strip().count(b'\n') == 0:
+                start = max(0, end - chunk_size)
+                f.seek(start)
+                tail = f.read(end - start) + tail
+                end = start
+        lines = tail.strip().splitlines()
+        return lines[-1] if lines else None
+
+    def list(self, dirname):
+        """List the .json files below a subdirectory, sorted."""
+        root = self._path(dirname)
+        found = []
+        for current, _, files in os.walk(root):
+            for name in files:
+                if name.endswith('.json'):
+                    path = os.path.join(current, name)
+                    path = os.path.relpath(path, self.root)
+                    found.append(path.replace(os.sep, '/'))
+        return sorted(found)
+
+
+class MemoryBackend:
+    """
+    Keeps data files in process memory.
+
+    Each instance is an isolated, initially empty store, which makes it
+    suited to tests running in parallel.
+    """
+
+    def __init__(self):
+        """Initialize an empty store."""
+        self.files = {}
+        self.cache = {}
+        self._versions = {}
+        self._lock = threading.Lock()
+        self._file_locks = {}
+
+    def lock(self, filename):
+        """Hold an exclusive lock on a data file within this process."""
+        with self._lock:
+            return self._file_locks.setdefault(filename, threading.Lock())
+
+    def stamp(self, filename):
+        """Return the file's write counter, or None if missing."""
+        return self._versions.get(filename)
+
+    def read(self, filename):
+        """Return the contents of a data file, or None if missing."""
+        return self.files.get(filename)
+
+    def write(self, filename, raw):
+        """Replace the contents of a data file."""
+        with self._lock:
+            self.files[filename] = bytes(raw)
+            self._versions[filename] = self._versions.get(filename, 0) + 1
+
+    def append(self, filename, raw):
+        """Append raw bytes to a data file, creating it if needed."""
+        with self._lock:
+            self.files[filename] = self.files.get(filename, b'') + raw
+            self._versions[filename] = self._versions.get(filename, 0) + 1
+
+    def iter_lines(self, filename, start=0):
+        """Lazily yield the lines of a data file from byte offset start."""
+        raw = self.files.get(filename, b'')
+        yield from raw[start:].splitlines(keepends=True)
+
+    def find_line(self, filename, predicate):
+        """
+        Return the offset of the first line for which predicate holds.
+
+        See _bisect_lines(); returns the file size if there is none.
+        """
+        raw = self.files.get(filename, b'')
+
+        def line_from(offset):
+            if offset:
+                offset = raw.find(b'\n', offset - 1) + 1 or len(raw)
+            end = raw.find(b'\n', offset) + 1 or len(raw)
+            return offset, raw[offset:end]
+        return _bisect_lines(line_from, len(raw), predicate)
+
+    def last_line(self, filename):
+        """Return the last non-empty line of a data file, or None."""
+        lines = self.files.get(filename, b'').strip().splitlines()
+        return lines[-1] if lines else None
+
+    def list(self, dirname):
+        """List the .json files below a subdirectory, sorted."""
+        prefix = dirname.rstrip('/') + '/'
+        return sorted(
+            name for name in self.files
+            if name.startswith(prefix) and name.endswith('.json')
+        )
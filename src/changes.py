@@ -0,0 +1,70 @@
+"""Sequence-numbered change feed shared by all models.
+
+Models publish a change after saving the data file it describes, so a
+crash between the two leaves the data written but the change missing
+from the feed. Consumers that cannot tolerate a missed change should
+periodically reconcile against the data files themselves.
+"""
+import threading
+from src.storage import append, iter_lines, last_line, locked
+
+FEED_FILE = 'changes.json'
+
+_lock = threading.Lock()
+_subscribers = []
+
+
+def publish(entity, op, record_id, data=None):
+    """
+    Append a change to the feed and notify subscribers.
+
+    entity is 'hotel', 'customer' or 'reservation'; op is 'create',
+    'update', 'delete' or 'cancel'. data carries the new field values
+    (None for deletes). Returns the stored change. Sequence numbers
+    are allocated under a lock on the feed file, so they stay unique
+    when several processes write to the same data directory.
+    """
+    with _lock, locked(FEED_FILE):
+        last = last_line(FEED_FILE)
+        change = {
+            "seq": last["seq"] + 1 if last else 1,
+            "entity": entity,
+            "op": op,
+            "id": record_id,
+            "data": data,
+        }
+        append(FEED_FILE, change)
+    for callback in list(_subscribers):
+        try:
+            callback(change)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            print(f"Warning: Change subscriber failed: {e}")
+    return change
+
+
+def changes_since(seq=0, entity=None):
+    """
+    Return the changes with a sequence number greater than seq.
+
+    Consumers remember the last seq they processed and pass it back in
+    to receive only new changes. entity optionally filters by model.
+    Sequence numbers are appended in increasing order, so the feed is
+    binary-searched for the first newer change rather than read from
+    the start.
+    """
+    return [
+        change
+        for change in iter_lines(FEED_FILE, lambda c: c["seq"] > seq)
+        if entity is None or change["entity"] == entity
+    ]
+
+
+def subscribe(callback):
+    """Call callback(change) for every change published in-process."""
+    _subscribers.append(callback)
+    return callback
+
+
+def unsubscribe(callback):
+    """Stop notifying callback. Raises ValueError if not subscribed."""
+    _subscribers.remove(callback)
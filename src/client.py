@@ -0,0 +1,230 @@
+"""Client for the reservation daemon, mirroring the model API."""
+import json
+import queue
+import socket
+from src.reservation import BookingInfo
+
+
+class Client:
+    """
+    Pooled connection to a ReservationServer.
+
+    Connections are opened on demand and up to pool_size idle ones are
+    kept for reuse, so the client is safe to share between threads.
+    """
+
+    def __init__(self, path, pool_size=4):
+        """Create a client for the server listening on path."""
+        self.path = path
+        self._idle = queue.LifoQueue(maxsize=pool_size)
+        self.hotels = RemoteHotels(self)
+        self.customers = RemoteCustomers(self)
+        self.reservations = RemoteReservations(self)
+
+    def _connect(self):
+        """Open a new connection to the server."""
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(self.path)
+        return sock, sock.makefile('rb')
+
+    def call(self, op, **args):
+        """
+        Send one request and return its result.
+
+        Raises ValueError with the server's message if the request
+        fails, and ConnectionError if the server hangs up.
+        """
+        try:
+            connection = self._idle.get_nowait()
+        except queue.Empty:
+            connection = self._connect()
+        sock, rfile = connection
+        try:
+            request = {"op": op, "args": args}
+            sock.sendall(json.dumps(request).encode('utf-8') + b'\n')
+            line = rfile.readline()
+            if not line:
+                raise ConnectionError("Server closed the connection")
+        except OSError:
+            self._discard(connection)
+            raise
+        try:
+            self._idle.put_nowait(connection)
+        except queue.Full:
+            self._discard(connection)
+        response = json.loads(line)
+        if not response["ok"]:
+            raise ValueError(response["error"])
+        return response["result"]
+
+    @staticmethod
+    def _discard(connection):
+        """Close a connection that will not be reused."""
+        sock, rfile = connection
+        rfile.close()
+        sock.close()
+
+    def close(self):
+        """Close every idle connection."""
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+    def __enter__(self):
+        """Return the client for use in a with statement."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Close the client when leaving a with statement."""
+        self.close()
+
+
+class RemoteHotel:
+    """Hotel served by the daemon."""
+
+    def __init__(self, client, hotel_id, name):
+        """Initialize a RemoteHotel with its client, id and name."""
+        self._client = client
+        self.id = hotel_id
+        self.name = name
+
+    def reserve_a_room(self, customer, booking_info):
+        """Reserve a room at this hotel for a customer."""
+        record = self._client.call(
+            "hotel.reserve_a_room",
+            hotel_id=self.id, customer_id=customer.id,
+            check_in=booking_info.check_in,
+            check_out=booking_info.check_out,
+            room=booking_info.room,
+        )
+        return RemoteReservation(self._client, record)
+
+    def reserve_rooms(self, customer, booking_infos):
+        """Reserve several rooms at once; all or nothing."""
+        records = self._client.call(
+            "hotel.reserve_rooms",
+            hotel_id=self.id, customer_id=customer.id,
+            bookings=[info._asdict() for info in booking_infos],
+        )
+        return [RemoteReservation(self._client, r) for r in records]
+
+    def cancel_a_reservation(self, reservation):
+        """Cancel a reservation at this hotel."""
+        reservation.cancel_reservation()
+
+    def to_str(self):
+        """Return a string representation of the hotel."""
+        return f"Hotel({self.id}, {self.name})"
+
+
+class RemoteCustomer:  # pylint: disable=too-few-public-methods
+    """Customer served by the daemon."""
+
+    def __init__(self, customer_id, name):
+        """Initialize a RemoteCustomer with an id and name."""
+        self.id = customer_id
+        self.name = name
+
+    def to_str(self):
+        """Return a string representation of the customer."""
+        return f"Customer({self.id}, {self.name})"
+
+
+class RemoteReservation:  # pylint: disable=too-few-public-methods
+    """Reservation served by the daemon."""
+
+    def __init__(self, client, record):
+        """Initialize a RemoteReservation from its wire record."""
+        self._client = client
+        self.id = record["id"]
+        self.hotel_id = record["hotel_id"]
+        self.customer_id = record["customer_id"]
+        self.booking_info = BookingInfo(
+            record["check_in"], record["check_out"], record["room"]
+        )
+        self.status = record["status"]
+
+    def cancel_reservation(self):
+        """Cancel this reservation on the server."""
+        record = self._client.call(
+            "reservation.cancel_reservation", id=self.id
+        )
+        self.status = record["status"]
+
+
+class RemoteHotels:
+    """Hotel class-level operations, as exposed by Client.hotels."""
+
+    def __init__(self, client):
+        """Initialize with the owning client."""
+        self._client = client
+
+    def _build(self, record):
+        """Build a RemoteHotel from a wire record."""
+        return RemoteHotel(self._client, record["id"], record["name"])
+
+    def create(self, name):
+        """Create a new hotel and return it."""
+        return self._build(self._client.call("hotel.create", name=name))
+
+    def find_by_id(self, hotel_id):
+        """Find a hotel by id. Raises ValueError if not found."""
+        return self._build(self._client.call("hotel.find_by_id", id=hotel_id))
+
+    def all(self):
+        """Return every hotel."""
+        return [self._build(r) for r in self._client.call("hotel.all")]
+
+
+class RemoteCustomers:
+    """Customer class-level operations, as exposed by Client.customers."""
+
+    def __init__(self, client):
+        """Initialize with the owning client."""
+        self._client = client
+
+    def create(self, name):
+        """Create a new customer and return it."""
+        record = self._client.call("customer.create", name=name)
+        return RemoteCustomer(record["id"], record["name"])
+
+    def find_by_id(self, customer_id):
+        """Find a customer by id. Raises ValueError if not found."""
+        record = self._client.call("customer.find_by_id", id=customer_id)
+        return RemoteCustomer(record["id"], record["name"])
+
+    def all(self):
+        """Return every customer."""
+        return [
+            RemoteCustomer(r["id"], r["name"])
+            for r in self._client.call("customer.all")
+        ]
+
+
+class RemoteReservations:
+    """Reservation class-level operations, as exposed by Client."""
+
+    def __init__(self, client):
+        """Initialize with the owning client."""
+        self._client = client
+
+    def create_reservation(self, *, customer, hotel, booking_info):
+        """Create a new reservation and return it."""
+        hotel = RemoteHotel(self._client, hotel.id, hotel.name)
+        return hotel.reserve_a_room(customer, booking_info)
+
+    def find_by_id(self, reservation_id):
+        """Find a reservation by id. Raises ValueError if not found."""
+        record = self._client.call(
+            "reservation.find_by_id", id=reservation_id
+        )
+        return RemoteReservation(self._client, record)
+
+    def all(self):
+        """Return every reservation."""
+        return [
+            RemoteReservation(self._client, r)
+            for r in self._client.call("reservation.all")
+        ]
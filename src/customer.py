@@ -1,9 +1,20 @@
 """Customer model with JSON persistence."""
-import uuid
-from src.storage import load, save
+import weakref
+from src.changes import publish
+from src.ids import new_id
+from src.storage import current_backend, load, save, stamp
 
 DATA_FILE = 'customers.json'
 
+# Normalized-name index per storage backend, as (file stamp, index)
+# pairs; rebuilt whenever the customers file changes.
+_name_indexes = weakref.WeakKeyDictionary()
+
+
+def _normalize_name(name):
+    """Return the case- and whitespace-insensitive form of a name."""
+    return " ".join(name.split()).casefold()
+
 
 class Customer:
     """Represents a customer with JSON persistence."""
@@ -16,12 +27,117 @@ class Customer:
     @classmethod
     def create(cls, name):
         """Create a new customer, persist it, and return the instance."""
-        customer = cls(customer_id=str(uuid.uuid4()), name=name)
+        customer = cls(customer_id=new_id(), name=name)
         data = load(DATA_FILE)
         data.append({"id": customer.id, "name": customer.name})
         save(DATA_FILE, data)
+        publish('customer', 'create', customer.id, {"name": customer.name})
         return customer
 
+    @classmethod
+    def get_or_create(cls, name):
+        """Return the customer matching name, creating it if missing."""
+        return cls.get_or_create_many([name])[0]
+
+    @classmethod
+    def get_or_create_many(cls, names):
+        """
+        Return one customer per name, creating only the missing ones.
+
+        Names are matched after normalization, so "Jon  Doe" and
+        "jon doe" resolve to the same customer. Lookups use an in-memory
+        hash index that is only rebuilt when the customers file changes,
+        and the file is written at most once per call.
+        """
+        index = cls._cached_name_index()
+        customers = []
+        created = []
+        for name in names:
+            key = _normalize_name(name)
+            if key not in index:
+                if not created:
+                    index = dict(index)
+                record = {"id": new_id(), "name": name}
+                index[key] = (record["id"], record["name"])
+                created.append(record)
+            customer_id, customer_name = index[key]
+            customers.append(cls(customer_id=customer_id, name=customer_name))
+        if created:
+            data = load(DATA_FILE)
+            data.extend(created)
+            save(DATA_FILE, data)
+            _name_indexes[current_backend()] = (stamp(DATA_FILE), index)
+        for record in created:
+            publish('customer', 'create', record["id"],
+                    {"name": record["name"]})
+        return customers
+
+    @classmethod
+    def find_duplicates(cls):
+        """
+        Find customers sharing a normalized name, without changing them.
+
+        The first record for each name is the one kept. Returns a dict
+        mapping every duplicate customer id to the id it merges into.
+        """
+        index = {}
+        duplicates = {}
+        for record in load(DATA_FILE):
+            if not cls._is_valid_record(record):
+                continue
+            key = _normalize_name(record["name"])
+            if key in index:
+                duplicates[record["id"]] = index[key]
+            else:
+                index[key] = record["id"]
+        return duplicates
+
+    @classmethod
+    def merge_duplicates(cls, duplicates=None):
+        """
+        Remove duplicate customers, keeping the first record per name.
+
+        duplicates is a mapping as returned by find_duplicates(), which
+        is called when it is omitted. Repoint reservations with
+        Reservation.reassign_customers() before merging, so that no
+        reservation is left referring to a removed customer. Returns
+        the mapping of removed ids to kept ids.
+        """
+        if duplicates is None:
+            duplicates = cls.find_duplicates()
+        if not duplicates:
+            return duplicates
+        data = load(DATA_FILE)
+        save(DATA_FILE, [
+            c for c in data
+            if not isinstance(c, dict) or c.get("id") not in duplicates
+        ])
+        for customer_id in duplicates:
+            publish('customer', 'delete', customer_id)
+        return duplicates
+
+    @classmethod
+    def _cached_name_index(cls):
+        """
+        Return the normalized-name index for the current store.
+
+        The index maps normalized names to (id, name) of the first
+        valid record using them. It is cached per backend and rebuilt
+        only when the customers file's stamp changes.
+        """
+        backend = current_backend()
+        current = stamp(DATA_FILE)
+        cached = _name_indexes.get(backend)
+        if cached is not None and cached[0] == current:
+            return cached[1]
+        index = {}
+        for record in load(DATA_FILE):
+            if cls._is_valid_record(record):
+                index.setdefault(_normalize_name(record["name"]),
+                                 (record["id"], record["name"]))
+        _name_indexes[backend] = (current, index)
+        return index
+
     @staticmethod
     def _is_valid_record(record):
         """Check if a record has all required keys."""
@@ -40,6 +156,21 @@ class Customer:
                 return cls(customer_id=c["id"], name=c["name"])
         raise ValueError(f"Customer {customer_id} not found")
 
+    @classmethod
+    def find_by_ids(cls, ids):
+        """
+        Find several customers with a single read.
+
+        Returns a dict mapping each found id to its Customer; ids that do
+        not exist are left out.
+        """
+        wanted = set(ids)
+        return {
+            c["id"]: cls(customer_id=c["id"], name=c["name"])
+            for c in load(DATA_FILE)
+            if cls._is_valid_record(c) and c["id"] in wanted
+        }
+
     @classmethod
     def all(cls):
         """Return a list of all persisted Customer instances."""
@@ -57,6 +188,7 @@ class Customer:
         if len(data) == original_len:
             raise ValueError(f"Customer {self.id} not found")
         save(DATA_FILE, data)
+        publish('customer', 'delete', self.id)
 
     def update(self, name):
         """Update the customer's name and persist the change to disk."""
@@ -67,6 +199,7 @@ class Customer:
                 c["name"] = name
                 break
         save(DATA_FILE, data)
+        publish('customer', 'update', self.id, {"name": name})
 
     def to_str(self):
         """Return a string representation of the customer."""
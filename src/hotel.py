@@ -1,5 +1,7 @@
 """Hotel model with JSON persistence."""
-import uuid
+from src import stats
+from src.changes import publish
+from src.ids import new_id
 from src.storage import load, save
 from src.reservation import Reservation
 
@@ -17,10 +19,11 @@ class Hotel:
     @classmethod
     def create(cls, name):
         """Create a new hotel, persist it, and return the instance."""
-        hotel = cls(hotel_id=str(uuid.uuid4()), name=name)
+        hotel = cls(hotel_id=new_id(), name=name)
         data = load(DATA_FILE)
         data.append({"id": hotel.id, "name": hotel.name})
         save(DATA_FILE, data)
+        publish('hotel', 'create', hotel.id, {"name": hotel.name})
         return hotel
 
     @staticmethod
@@ -41,6 +44,21 @@ class Hotel:
                 return cls(hotel_id=h["id"], name=h["name"])
         raise ValueError(f"Hotel {hotel_id} not found")
 
+    @classmethod
+    def find_by_ids(cls, ids):
+        """
+        Find several hotels with a single read.
+
+        Returns a dict mapping each found id to its Hotel; ids that do
+        not exist are left out.
+        """
+        wanted = set(ids)
+        return {
+            h["id"]: cls(hotel_id=h["id"], name=h["name"])
+            for h in load(DATA_FILE)
+            if cls._is_valid_record(h) and h["id"] in wanted
+        }
+
     @classmethod
     def all(cls):
         """Return a list of all persisted Hotel instances."""
@@ -58,6 +76,7 @@ class Hotel:
         if len(data) == original_len:
             raise ValueError(f"Hotel {self.id} not found")
         save(DATA_FILE, data)
+        publish('hotel', 'delete', self.id)
 
     def update(self, name):
         """Update the hotel's name and persist the change to disk."""
@@ -68,6 +87,7 @@ class Hotel:
                 h["name"] = name
                 break
         save(DATA_FILE, data)
+        publish('hotel', 'update', self.id, {"name": name})
 
     def reserve_a_room(self, customer, booking_info):
         """Reserve a room at this hotel for a customer."""
@@ -75,10 +95,31 @@ class Hotel:
             customer=customer, hotel=self, booking_info=booking_info
         )
 
+    def reserve_rooms(self, customer, booking_infos):
+        """
+        Reserve several rooms at this hotel for a customer at once.
+
+        Either every booking is made or, if any room is unavailable,
+        none is and ValueError is raised.
+        """
+        return Reservation.create_reservations(
+            customer=customer, hotel=self, booking_infos=booking_infos
+        )
+
     def cancel_a_reservation(self, reservation):
         """Cancel a reservation at this hotel."""
         reservation.cancel_reservation()
 
+    def stats(self):
+        """
+        Return this hotel's reservation statistics.
+
+        The result holds the active and cancelled reservation counts
+        and active room-nights per check-in month, maintained as
+        reservations are created and cancelled.
+        """
+        return stats.get(self.id)
+
     def to_str(self):
         """Return a string representation of the hotel."""
         return f"Hotel({self.id}, {self.name})"
@@ -0,0 +1,101 @@
+"""Identifier generation with random and time-ordered strategies."""
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+STRATEGIES = ('uuid4', 'ulid')
+_settings = {"strategy": 'uuid4'}
+
+# Crockford base32, as used by ULIDs.
+ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+ULID_LENGTH = 26
+_RANDOM_BITS = 80
+
+_lock = threading.Lock()
+_last = {"ms": -1, "random": 0}
+
+
+def set_strategy(strategy):
+    """
+    Select how new ids are generated.
+
+    'uuid4' produces random 36-character UUIDs; 'ulid' produces
+    26-character ids that sort by creation time. Existing ids of
+    either kind stay valid. Raises ValueError for an unknown strategy.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown id strategy {strategy}")
+    _settings["strategy"] = strategy
+
+
+def get_strategy():
+    """Return the name of the active id strategy."""
+    return _settings["strategy"]
+
+
+def new_id():
+    """Return a new id using the active strategy."""
+    if _settings["strategy"] == 'ulid':
+        return new_ulid()
+    return str(uuid.uuid4())
+
+
+def _encode(value):
+    """Encode a 128-bit integer as a ULID string."""
+    chars = []
+    for _ in range(ULID_LENGTH):
+        chars.append(ALPHABET[value & 31])
+        value >>= 5
+    return ''.join(reversed(chars))
+
+
+def new_ulid():
+    """
+    Return a ULID: a 48-bit millisecond timestamp then 80 random bits.
+
+    Ids generated in the same millisecond by this process increment
+    the random part, so they still sort in creation order. If the
+    random part would overflow, waits for the next millisecond.
+    """
+    with _lock:
+        ms = time.time_ns() // 1_000_000
+        randomness = _last["random"] + 1
+        if ms <= _last["ms"] and randomness < 1 << _RANDOM_BITS:
+            ms = _last["ms"]
+        else:
+            while ms <= _last["ms"]:
+                ms = time.time_ns() // 1_000_000
+            randomness = int.from_bytes(os.urandom(10), 'big')
+        _last["ms"] = ms
+        _last["random"] = randomness
+    return _encode((ms << _RANDOM_BITS) | randomness)
+
+
+def is_ulid(identifier):
+    """Return whether identifier is a ULID."""
+    return (
+        isinstance(identifier, str) and len(identifier) == ULID_LENGTH
+        and all(c in ALPHABET for c in identifier)
+    )
+
+
+def timestamp_of(identifier):
+    """
+    Return the creation time embedded in a ULID as an aware datetime.
+
+    Returns None for ids without a timestamp, such as uuid4 ids.
+    """
+    if not is_ulid(identifier):
+        return None
+    value = 0
+    for c in identifier:
+        value = value * 32 + ALPHABET.index(c)
+    ms = value >> _RANDOM_BITS
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc)
+
+
+def lower_bound(when):
+    """Return the smallest ULID that could be created at datetime when."""
+    return _encode(int(when.timestamp() * 1000) << _RANDOM_BITS)
@@ -1,13 +1,55 @@
 """Reservation model with JSON persistence."""
-import uuid
 from collections import namedtuple
-from src.storage import load, save
+from src import stats
+from src.changes import publish
+from src.customer import Customer
+from src.ids import is_ulid, lower_bound, new_id
+from src.storage import list_files, load, locked, save
 
+# Unpartitioned file from earlier releases; still read, never appended to.
 DATA_FILE = 'reservations.json'
+PARTITION_DIR = 'reservations'
+# When True, each hotel partition is further split by check-in month.
+PARTITION_BY_MONTH = False
 
 BookingInfo = namedtuple('BookingInfo', ['check_in', 'check_out', 'room'])
 
 
+def _related_model(relation):
+    """Return the model class behind a relation or raise ValueError."""
+    # src.hotel imports this module, so Hotel is imported on first use.
+    # pylint: disable-next=import-outside-toplevel,cyclic-import
+    from src.hotel import Hotel
+    models = {'hotel': Hotel, 'customer': Customer}
+    if relation not in models:
+        raise ValueError(f"Unknown relation {relation}")
+    return models[relation]
+
+
+def partition_for(hotel_id, check_in):
+    """Return the data file that stores a reservation."""
+    if PARTITION_BY_MONTH:
+        return f"{PARTITION_DIR}/{hotel_id}/{check_in[:7]}.json"
+    return f"{PARTITION_DIR}/{hotel_id}.json"
+
+
+def locked_hotel(hotel_id):
+    """
+    Return a context manager holding the lock on a hotel's reservations.
+
+    Writers hold it from reading a hotel's partitions until its
+    statistics are updated, so availability checks and counters see
+    one writer at a time.
+    """
+    return locked(f"{PARTITION_DIR}/{hotel_id}.json")
+
+
+def _overlaps(first, second):
+    """Return whether two bookings of the same room share a night."""
+    return (first.check_in < second.check_out
+            and second.check_in < first.check_out)
+
+
 class Reservation:
     """Represents a reservation with JSON persistence."""
 
@@ -20,38 +62,225 @@ class Reservation:
         self.customer_id = customer_id
         self.booking_info = booking_info
         self.status = status
+        self._hotel = None
+        self._customer = None
+
+    @property
+    def hotel(self):
+        """Return the reserved Hotel, loading it on first access."""
+        if self._hotel is None:
+            self._hotel = _related_model('hotel').find_by_id(self.hotel_id)
+        return self._hotel
+
+    @property
+    def customer(self):
+        """Return the reserving Customer, loading it on first access."""
+        if self._customer is None:
+            self._customer = _related_model('customer').find_by_id(
+                self.customer_id
+            )
+        return self._customer
 
     @classmethod
     def create_reservation(cls, *, customer, hotel, booking_info):
         """Create a new reservation, persist it, and return the instance."""
         reservation = cls(
-            reservation_id=str(uuid.uuid4()),
+            reservation_id=new_id(),
             hotel_id=hotel.id,
             customer_id=customer.id,
             booking_info=booking_info,
         )
-        data = load(DATA_FILE)
-        data.append({
-            "id": reservation.id,
-            "hotel_id": reservation.hotel_id,
-            "customer_id": reservation.customer_id,
-            "check_in": reservation.booking_info.check_in,
-            "check_out": reservation.booking_info.check_out,
-            "room": reservation.booking_info.room,
-            "status": reservation.status,
-        })
-        save(DATA_FILE, data)
+        reservation._hotel = hotel
+        reservation._customer = customer
+        partition = reservation.partition()
+        record = reservation.to_record()
+        with locked_hotel(hotel.id):
+            data = load(partition)
+            data.append(record)
+            save(partition, data)
+            stats.record_created(record)
+        publish('reservation', 'create', reservation.id, record)
         return reservation
 
+    @classmethod
+    def create_reservations(cls, *, customer, hotel, booking_infos):
+        """
+        Create several reservations at one hotel, all or nothing.
+
+        Every booking is checked against the hotel's active reservations
+        and against the other bookings in the same call before anything
+        is written, holding the hotel's lock from the check through the
+        write. Raises ValueError listing the conflicts, leaving the
+        stored data untouched. Otherwise each affected partition is
+        written once and the new reservations are returned.
+        """
+        reservations = []
+        for info in booking_infos:
+            if not info.check_in < info.check_out:
+                raise ValueError(
+                    f"Room {info.room}: check_out must be after check_in"
+                )
+            reservation = cls(reservation_id=new_id(), hotel_id=hotel.id,
+                              customer_id=customer.id, booking_info=info)
+            reservation._hotel = hotel
+            reservation._customer = customer
+            reservations.append(reservation)
+        by_partition = {}
+        for reservation in reservations:
+            by_partition.setdefault(reservation.partition(), []).append(
+                reservation.to_record()
+            )
+        records = [r for batch in by_partition.values() for r in batch]
+        with locked_hotel(hotel.id):
+            conflicts = cls._find_conflicts(hotel.id, reservations)
+            if conflicts:
+                raise ValueError("Rooms unavailable: " + "; ".join(conflicts))
+            cls._write_all_or_nothing(by_partition)
+            stats.record_created_many(records)
+        for record in records:
+            publish('reservation', 'create', record["id"], record)
+        return reservations
+
+    @classmethod
+    def _find_conflicts(cls, hotel_id, reservations):
+        """Describe overlaps among reservations and existing bookings."""
+        requested = {}
+        conflicts = []
+        for reservation in reservations:
+            info = reservation.booking_info
+            for other in requested.get(info.room, []):
+                if _overlaps(info, other):
+                    conflicts.append(
+                        f"room {info.room} requested twice for "
+                        f"{other.check_in}..{other.check_out}"
+                    )
+            requested.setdefault(info.room, []).append(info)
+        for existing in cls.iter_all(cls.partitions(hotel_id)):
+            if existing.hotel_id != hotel_id or existing.status != "active":
+                continue
+            info = existing.booking_info
+            for wanted in requested.get(info.room, []):
+                if _overlaps(info, wanted):
+                    conflicts.append(
+                        f"room {info.room} booked by {existing.id} for "
+                        f"{info.check_in}..{info.check_out}"
+                    )
+        return conflicts
+
+    @staticmethod
+    def _write_all_or_nothing(by_partition):
+        """
+        Append records to partitions, removing them again on failure.
+
+        If a write fails, only the records appended by this call are
+        taken back out of the partitions already written.
+        """
+        added = set()
+        written = []
+        try:
+            for partition, records in by_partition.items():
+                save(partition, load(partition) + records)
+                written.append(partition)
+                added.update(r["id"] for r in records)
+        except Exception:
+            for partition in reversed(written):
+                save(partition, [
+                    r for r in load(partition)
+                    if not (isinstance(r, dict) and r.get("id") in added)
+                ])
+            raise
+
+    def to_record(self):
+        """Return the stored representation of this reservation."""
+        return {
+            "id": self.id,
+            "hotel_id": self.hotel_id,
+            "customer_id": self.customer_id,
+            "check_in": self.booking_info.check_in,
+            "check_out": self.booking_info.check_out,
+            "room": self.booking_info.room,
+            "status": self.status,
+        }
+
     def cancel_reservation(self):
         """Cancel this reservation and persist the change."""
         self.status = "cancelled"
-        data = load(DATA_FILE)
-        for r in data:
-            if r["id"] == self.id:
-                r["status"] = "cancelled"
-                break
-        save(DATA_FILE, data)
+        with locked_hotel(self.hotel_id):
+            record = self._store_cancelled()
+            if record is not None:
+                stats.record_cancelled(record)
+        if record is not None:
+            publish('reservation', 'cancel', self.id,
+                    {"status": "cancelled"})
+
+    def _store_cancelled(self):
+        """Mark the stored record cancelled; return it if it changed."""
+        candidates = [self.partition()] + self.partitions(self.hotel_id)
+        for partition in dict.fromkeys(candidates):
+            data = load(partition)
+            for r in data:
+                if isinstance(r, dict) and r.get("id") == self.id:
+                    if r.get("status") == "cancelled":
+                        return None
+                    r["status"] = "cancelled"
+                    save(partition, data)
+                    return r
+        return None
+
+    def partition(self):
+        """Return the data file this reservation is routed to."""
+        return partition_for(self.hotel_id, self.booking_info.check_in)
+
+    @staticmethod
+    def partitions(hotel_id=None):
+        """
+        Return the data files holding reservations.
+
+        When hotel_id is given only that hotel's partitions (plus the
+        legacy unpartitioned file) are returned. Partitions are
+        independent, so callers may process them in parallel.
+        """
+        files = list_files(PARTITION_DIR)
+        if hotel_id is not None:
+            files = [
+                f for f in files
+                if f == f"{PARTITION_DIR}/{hotel_id}.json"
+                or f.startswith(f"{PARTITION_DIR}/{hotel_id}/")
+            ]
+        return [DATA_FILE] + files
+
+    @classmethod
+    def reassign_customers(cls, mapping):
+        """
+        Point reservations of merged customers at their surviving id.
+
+        mapping is a dict of old customer id to new customer id, as
+        returned by Customer.merge_duplicates(). Returns the number of
+        reservations that were rewritten.
+        """
+        changed = 0
+        for partition in cls.partitions():
+            data = load(partition)
+            updated = []
+            for r in data:
+                if isinstance(r, dict) and r.get("customer_id") in mapping:
+                    r["customer_id"] = mapping[r["customer_id"]]
+                    updated.append(r)
+            if updated:
+                save(partition, data)
+            for r in updated:
+                publish('reservation', 'update', r.get("id"),
+                        {"customer_id": r["customer_id"]})
+            changed += len(updated)
+        return changed
+
+    @classmethod
+    def rebuild_stats(cls):
+        """Recompute the materialized per-hotel statistics from scratch."""
+        return stats.rebuild(
+            r for partition in cls.partitions() for r in load(partition)
+            if cls._is_valid_record(r)
+        )
 
     @staticmethod
     def _is_valid_record(record):
@@ -81,16 +310,74 @@ class Reservation:
         )
 
     @classmethod
-    def find_by_id(cls, reservation_id):
-        """Find a reservation by id. Raises ValueError if not found."""
-        data = load(DATA_FILE)
-        for r in data:
-            if cls._is_valid_record(r) and r["id"] == reservation_id:
-                return cls._build(r)
+    def find_by_id(cls, reservation_id, hotel_id=None):
+        """
+        Find a reservation by id. Raises ValueError if not found.
+
+        Passing hotel_id limits the search to that hotel's partitions.
+        """
+        for reservation in cls.iter_all(cls.partitions(hotel_id)):
+            if reservation.id == reservation_id:
+                return reservation
         raise ValueError(f"Reservation {reservation_id} not found")
 
     @classmethod
-    def all(cls):
-        """Return a list of all persisted Reservation instances."""
-        data = load(DATA_FILE)
-        return [cls._build(r) for r in data if cls._is_valid_record(r)]
+    def iter_all(cls, partitions=None):
+        """Lazily yield reservations, reading one partition at a time."""
+        if partitions is None:
+            partitions = cls.partitions()
+        for partition in partitions:
+            for r in load(partition):
+                if cls._is_valid_record(r):
+                    yield cls._build(r)
+
+    @classmethod
+    def created_since(cls, when, hotel_id=None):
+        """
+        Return reservations created at or after datetime when.
+
+        Only reservations with time-ordered (ULID) ids carry a creation
+        time; others are skipped. The bound is compared against the ids
+        as strings, so only matching records are validated and built,
+        but every partition is still read and decoded in full. Every
+        record is checked because processes writing concurrently can
+        store an older id after a newer one.
+        """
+        bound = lower_bound(when)
+        found = [
+            cls._build(r)
+            for partition in cls.partitions(hotel_id)
+            for r in load(partition)
+            if isinstance(r, dict) and is_ulid(r.get("id"))
+            and r["id"] >= bound and cls._is_valid_record(r)
+        ]
+        return sorted(found, key=lambda r: r.id)
+
+    @classmethod
+    def all(cls, prefetch=()):
+        """
+        Return a list of all persisted Reservation instances.
+
+        prefetch names relations to load up front, e.g.
+        ("hotel", "customer"); see Reservation.prefetch().
+        """
+        reservations = list(cls.iter_all())
+        cls.prefetch(reservations, prefetch)
+        return reservations
+
+    @staticmethod
+    def prefetch(reservations, relations):
+        """
+        Load relations for many reservations with one read per file.
+
+        Replaces a find_by_id call per reservation with a single batched
+        lookup per relation. Raises ValueError for an unknown relation.
+        Reservations whose hotel or customer no longer exists are left
+        to load lazily, raising ValueError on access.
+        """
+        for relation in relations:
+            model = _related_model(relation)
+            key = f"{relation}_id"
+            found = model.find_by_ids({getattr(r, key) for r in reservations})
+            for r in reservations:
+                setattr(r, f"_{relation}", found.get(getattr(r, key)))
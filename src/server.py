@@ -0,0 +1,365 @@
+"""Long-running reservation daemon serving the models over a Unix socket.
+
+Requests and responses are single JSON lines. A request looks like
+{"op": "hotel.create", "args": {"name": "Hilton"}} and is answered with
+{"ok": true, "result": ...} or {"ok": false, "error": "..."}.
+Connections are persistent, so one client connection can send many
+requests, and idle connections do not tie up worker threads.
+"""
+import argparse
+import contextvars
+import json
+import os
+import queue
+import selectors
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from src import customer as customer_module
+from src import hotel as hotel_module
+from src import storage
+from src.customer import Customer
+from src.hotel import Hotel
+from src.reservation import BookingInfo, Reservation
+
+
+def _hotel_record(hotel):
+    """Return the wire representation of a Hotel."""
+    return {"id": hotel.id, "name": hotel.name}
+
+
+def _customer_record(customer):
+    """Return the wire representation of a Customer."""
+    return {"id": customer.id, "name": customer.name}
+
+
+def _reservation_record(reservation):
+    """Return the wire representation of a Reservation."""
+    return reservation.to_record()
+
+
+def _reserve_a_room(args):
+    """Reserve a room from wire arguments."""
+    hotel = Hotel.find_by_id(args["hotel_id"])
+    customer = Customer.find_by_id(args["customer_id"])
+    info = BookingInfo(args["check_in"], args["check_out"], args["room"])
+    return _reservation_record(hotel.reserve_a_room(customer, info))
+
+
+def _reserve_rooms(args):
+    """Reserve several rooms at once from wire arguments."""
+    hotel = Hotel.find_by_id(args["hotel_id"])
+    customer = Customer.find_by_id(args["customer_id"])
+    infos = [
+        BookingInfo(b["check_in"], b["check_out"], b["room"])
+        for b in args["bookings"]
+    ]
+    return [
+        _reservation_record(r) for r in hotel.reserve_rooms(customer, infos)
+    ]
+
+
+def _cancel_reservation(args):
+    """Cancel a reservation from wire arguments."""
+    reservation = Reservation.find_by_id(args["id"])
+    reservation.cancel_reservation()
+    return _reservation_record(reservation)
+
+
+# Operations that write, run one at a time through the models.
+OPERATIONS = {
+    "hotel.create": lambda a: _hotel_record(Hotel.create(a["name"])),
+    "hotel.reserve_a_room": _reserve_a_room,
+    "hotel.reserve_rooms": _reserve_rooms,
+    "customer.create": lambda a: _customer_record(
+        Customer.create(a["name"])
+    ),
+    "reservation.cancel_reservation": _cancel_reservation,
+}
+# Resident tables each write operation changes.
+WRITE_OPERATIONS = {
+    "hotel.create": ("hotel",),
+    "hotel.reserve_a_room": ("reservation",),
+    "hotel.reserve_rooms": ("reservation",),
+    "customer.create": ("customer",),
+    "reservation.cancel_reservation": ("reservation",),
+}
+# Operations answered from a resident table, as (table, action).
+READ_OPERATIONS = {
+    f"{table}.{action}": (table, action)
+    for table in ("hotel", "customer", "reservation")
+    for action in ("find_by_id", "all")
+}
+
+
+class _ResidentTable:
+    """
+    Wire records of one model kept decoded in memory, keyed by id.
+
+    Lookups are dictionary reads. The backing files' stamps are checked
+    at most every max_age seconds, and the daemon invalidates a table
+    after each of its own writes, so only changes made by other
+    processes can take up to max_age seconds to show up.
+    """
+
+    def __init__(self, model, files, to_record, max_age):
+        """Initialize an empty table for model stored in files()."""
+        self._model = model
+        self._files = files
+        self._to_record = to_record
+        self._max_age = max_age
+        self._lock = threading.Lock()
+        self._checked = 0.0
+        # (file stamps, records by id) as of the last load, or None.
+        self._loaded = None
+
+    def invalidate(self):
+        """Reload the table on its next use."""
+        with self._lock:
+            self._loaded = None
+
+    def _current(self):
+        """Return the records, reloading them if the files changed."""
+        with self._lock:
+            now = time.monotonic()
+            if self._loaded is None or now - self._checked >= self._max_age:
+                stamps = [(f, storage.stamp(f)) for f in self._files()]
+                if self._loaded is None or self._loaded[0] != stamps:
+                    records = map(self._to_record, self._model.all())
+                    self._loaded = (stamps, {r["id"]: r for r in records})
+                self._checked = now
+            return self._loaded[1]
+
+    def find_by_id(self, args):
+        """Return the record with args["id"]. Raises ValueError if missing."""
+        record = self._current().get(args["id"])
+        if record is None:
+            raise ValueError(f"{self._model.__name__} {args['id']} not found")
+        return record
+
+    def all(self, _args):
+        """Return every record in file order."""
+        return list(self._current().values())
+
+
+class ReservationServer:  # pylint: disable=too-many-instance-attributes
+    """
+    Unix socket server that runs each request on a thread pool.
+
+    The serving thread accepts connections and reads from all of them;
+    every complete request line is handed to a worker, so idle client
+    connections do not hold a worker. Requests on one connection are
+    answered in order. Reads are answered from resident tables of
+    decoded records and run concurrently; writes go through the models
+    one at a time, because every write rewrites a whole data file.
+    """
+
+    def __init__(self, path, workers=8, max_age=1.0):
+        """
+        Bind to path and start a pool of worker threads.
+
+        max_age bounds, in seconds, how long changes written by other
+        processes can take to reach the resident tables.
+        """
+        self.server_address = path
+        self._pool = ThreadPoolExecutor(max_workers=workers)
+        self._write_lock = threading.Lock()
+        self._tables = {
+            "hotel": _ResidentTable(
+                Hotel, lambda: [hotel_module.DATA_FILE], _hotel_record,
+                max_age,
+            ),
+            "customer": _ResidentTable(
+                Customer, lambda: [customer_module.DATA_FILE],
+                _customer_record, max_age,
+            ),
+            "reservation": _ResidentTable(
+                Reservation, Reservation.partitions, _reservation_record,
+                max_age,
+            ),
+        }
+        # Workers serve the storage backend selected where the server
+        # was created, e.g. inside storage.use_data_dir().
+        self._context = contextvars.copy_context()
+        self._selector = selectors.DefaultSelector()
+        # Partial request bytes per open connection.
+        self._buffers = {}
+        # Connections handed back by workers, with whether still open.
+        self._finished = queue.SimpleQueue()
+        self._waker, self._wake = socket.socketpair()
+        self._stop = threading.Event()
+        self._stopped = threading.Event()
+        self._stopped.set()
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self.socket.bind(path)
+            self.socket.listen()
+        except OSError:
+            self.socket.close()
+            raise
+        self._selector.register(self.socket, selectors.EVENT_READ,
+                                self._accept)
+        self._selector.register(self._waker, selectors.EVENT_READ,
+                                self._rearm)
+
+    def serve_forever(self, poll_interval=0.5):
+        """Serve connections until shutdown() is called."""
+        self._stop.clear()
+        self._stopped.clear()
+        try:
+            while not self._stop.is_set():
+                for key, _ in self._selector.select(poll_interval):
+                    key.data(key.fileobj)
+        finally:
+            self._stopped.set()
+
+    def shutdown(self):
+        """Stop serve_forever() and wait for it to return."""
+        self._stop.set()
+        self._wakeup()
+        self._stopped.wait()
+
+    def _wakeup(self):
+        """Interrupt the serving thread's select()."""
+        try:
+            self._wake.send(b'\0')
+        except OSError:
+            pass
+
+    def _accept(self, sock):
+        """Start reading from a new client connection."""
+        connection, _ = sock.accept()
+        self._buffers[connection] = b''
+        self._selector.register(connection, selectors.EVENT_READ, self._read)
+
+    def _read(self, connection):
+        """Buffer incoming bytes and dispatch complete request lines."""
+        try:
+            data = connection.recv(65536)
+        except OSError:
+            data = b''
+        if not data:
+            self._close(connection)
+            return
+        buffer = self._buffers[connection] + data
+        complete, newline, rest = buffer.rpartition(b'\n')
+        if not newline:
+            self._buffers[connection] = buffer
+            return
+        self._buffers[connection] = rest
+        # Stop reading until the worker has answered, keeping replies
+        # in request order.
+        self._selector.unregister(connection)
+        self._pool.submit(self._context.copy().run, self._answer,
+                          connection, complete.split(b'\n'))
+
+    def _answer(self, connection, lines):
+        """Answer request lines on a worker thread."""
+        still_open = True
+        try:
+            for line in lines:
+                if line.strip():
+                    response = json.dumps(self.dispatch(line))
+                    connection.sendall(response.encode('utf-8') + b'\n')
+        except OSError:
+            still_open = False
+        finally:
+            self._finished.put((connection, still_open))
+            self._wakeup()
+
+    def _rearm(self, waker):
+        """Resume reading from connections that workers are done with."""
+        waker.recv(4096)
+        while True:
+            try:
+                connection, still_open = self._finished.get_nowait()
+            except queue.Empty:
+                return
+            if still_open and connection in self._buffers:
+                self._selector.register(connection, selectors.EVENT_READ,
+                                        self._read)
+            else:
+                self._close(connection)
+
+    def _close(self, connection):
+        """Forget and close a client connection."""
+        try:
+            self._selector.unregister(connection)
+        except (KeyError, ValueError):
+            pass
+        self._buffers.pop(connection, None)
+        connection.close()
+
+    def _run(self, op, args):
+        """Run one operation and return its result."""
+        if op in READ_OPERATIONS:
+            table, action = READ_OPERATIONS[op]
+            return getattr(self._tables[table], action)(args)
+        if op not in OPERATIONS:
+            raise ValueError(f"Unknown operation {op}")
+        with self._write_lock:
+            try:
+                return OPERATIONS[op](args)
+            finally:
+                for table in WRITE_OPERATIONS[op]:
+                    self._tables[table].invalidate()
+
+    def dispatch(self, line):
+        """Run the request encoded in line and return the response."""
+        # Every failure is reported, so the client is never left waiting
+        # for a reply.
+        try:
+            request = json.loads(line)
+            result = self._run(request.get("op"), request.get("args") or {})
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        return {"ok": True, "result": result}
+
+    def server_close(self):
+        """Finish running requests, close every socket and unlink path."""
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        for connection in list(self._buffers):
+            self._close(connection)
+        self._selector.close()
+        self.socket.close()
+        self._waker.close()
+        self._wake.close()
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+
+    def __enter__(self):
+        """Return the server for use in a with statement."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Close the server when leaving a with statement."""
+        self.server_close()
+
+
+def serve(path, workers=8, max_age=1.0):
+    """Serve requests on path until interrupted."""
+    storage.enable_cache()
+    with ReservationServer(path, workers=workers, max_age=max_age) as server:
+        print(f"Serving on {path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+def main():
+    """Parse command line arguments and run the server."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="Unix socket path to listen on")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument(
+        "--max-age", type=float, default=1.0,
+        help="seconds before changes by other processes are picked up",
+    )
+    args = parser.parse_args()
+    serve(args.path, workers=args.workers, max_age=args.max_age)
+
+
+if __name__ == "__main__":
+    main()
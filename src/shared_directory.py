@@ -0,0 +1,297 @@
+"""Read-only hotel and customer directory in shared memory.
+
+One process runs a DirectoryPublisher, which writes a compact snapshot
+of every hotel and customer name into a shared memory segment. A
+background thread checks the hotel and customer data files every
+interval and republishes when either changed, whichever process wrote
+it, so a burst of changes costs one snapshot. Worker processes open a
+SharedDirectory and resolve ids with a binary search over the segment,
+without parsing the data files or holding a private copy of them.
+
+A small control segment holds the current generation number; each
+publish writes a new snapshot segment named after its generation and
+then bumps the counter, so readers notice and reattach on their next
+lookup.
+"""
+import contextvars
+import struct
+import sys
+import threading
+from multiprocessing import resource_tracker, shared_memory
+from src import customer as customer_module
+from src import hotel as hotel_module
+from src.customer import Customer
+from src.hotel import Hotel
+from src.storage import stamp
+
+DEFAULT_NAME = 'hoteldir'
+MAGIC = b'HRSHDIR1'
+CONTROL = struct.Struct('<Q')
+HEADER = struct.Struct('<8sQII')
+ENTRY = struct.Struct('<IIII')
+# Seconds between checks of the data files for changes.
+DEFAULT_INTERVAL = 0.05
+# Attempts to attach when snapshots are replaced faster than we read.
+ATTACH_RETRIES = 5
+
+# Segments created by this process, which the resource tracker owns.
+_owned = set()
+
+
+def _attach(name):
+    """Attach to an existing segment without tying it to our lifetime."""
+    if sys.version_info >= (3, 13):
+        # pylint: disable-next=unexpected-keyword-arg
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Before Python 3.13 every attach registers the segment with the
+    # resource tracker, which unlinks it when this process exits; undo
+    # that for segments owned by another process.
+    segment = shared_memory.SharedMemory(name=name)
+    if name not in _owned:
+        # pylint: disable-next=protected-access
+        resource_tracker.unregister(segment._name, 'shared_memory')
+    return segment
+
+
+def _create(name, size):
+    """Create a segment owned by this process."""
+    segment = shared_memory.SharedMemory(name=name, create=True, size=size)
+    _owned.add(name)
+    return segment
+
+
+def _unlink(segment):
+    """Close and remove a segment created by this process."""
+    segment.close()
+    segment.unlink()
+    _owned.discard(segment.name)
+
+
+def encode_snapshot(generation, hotels, customers):
+    """
+    Encode id/name pairs into the shared snapshot layout.
+
+    The layout is a header, then for hotels and then customers a table
+    of (id offset, id length, name offset, name length) entries sorted
+    by id, followed by the UTF-8 strings the entries point to.
+    """
+    tables = [
+        sorted((k.encode('utf-8'), v.encode('utf-8')) for k, v in pairs)
+        for pairs in (hotels, customers)
+    ]
+    offset = HEADER.size + ENTRY.size * sum(len(t) for t in tables)
+    entries = []
+    blob = []
+    for table in tables:
+        for key, value in table:
+            entries.append(ENTRY.pack(offset, len(key),
+                                      offset + len(key), len(value)))
+            blob.append(key + value)
+            offset += len(key) + len(value)
+    header = HEADER.pack(MAGIC, generation, len(tables[0]), len(tables[1]))
+    return header + b''.join(entries) + b''.join(blob)
+
+
+def _search(buf, start, count, key):
+    """Binary search a sorted entry table; returns the name or None."""
+    low, high = 0, count
+    while low < high:
+        middle = (low + high) // 2
+        key_off, key_len, name_off, name_len = ENTRY.unpack_from(
+            buf, HEADER.size + ENTRY.size * (start + middle)
+        )
+        candidate = bytes(buf[key_off:key_off + key_len])
+        if candidate == key:
+            return bytes(buf[name_off:name_off + name_len]).decode('utf-8')
+        if candidate < key:
+            low = middle + 1
+        else:
+            high = middle
+    return None
+
+
+class _Watcher(threading.Thread):
+    """Daemon thread calling function every interval seconds until stopped."""
+
+    def __init__(self, interval, function):
+        """Initialize a watcher; start() begins calling function."""
+        super().__init__(daemon=True)
+        self.interval = interval
+        self._function = function
+        self._stopping = threading.Event()
+        self._context = None
+
+    def start(self):
+        """Start watching, using the storage backend active here."""
+        self._context = contextvars.copy_context()
+        super().start()
+
+    def run(self):
+        """Call the function until stop() is called."""
+        while not self._stopping.wait(self.interval):
+            try:
+                self._context.run(self._function)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                print(f"Warning: Shared directory refresh failed: {e}")
+
+    def stop(self):
+        """Stop watching and wait for a running call to finish."""
+        self._stopping.set()
+        if self.is_alive():
+            self.join()
+
+
+def _source_stamps():
+    """Return the versions of the files a snapshot is built from."""
+    return (stamp(hotel_module.DATA_FILE), stamp(customer_module.DATA_FILE))
+
+
+class DirectoryPublisher:
+    """Publishes hotel and customer snapshots for SharedDirectory readers."""
+
+    def __init__(self, name=DEFAULT_NAME, interval=DEFAULT_INTERVAL):
+        """
+        Initialize a publisher for the directory called name.
+
+        Once started, the hotel and customer files are checked every
+        interval seconds, so changes made by any process reach readers
+        within about that time.
+        """
+        self.name = name
+        self.generation = 0
+        self._control = None
+        self._snapshot = None
+        self._lock = threading.Lock()
+        # Versions of the source files in the published snapshot.
+        self._stamps = None
+        self._watcher = _Watcher(interval, self.refresh)
+
+    def start(self):
+        """Create the directory, publish it, and follow data changes."""
+        self._control = _create(f"{self.name}-ctl", CONTROL.size)
+        self.publish()
+        self._watcher.start()
+        return self
+
+    def refresh(self):
+        """Publish a new snapshot if hotels or customers have changed."""
+        with self._lock:
+            if _source_stamps() != self._stamps:
+                self._publish()
+
+    def publish(self):
+        """Write a fresh snapshot and advance the generation counter."""
+        with self._lock:
+            self._publish()
+
+    def _publish(self):
+        """Publish a snapshot; the caller holds the lock."""
+        # Taken before reading, so a write racing with the read is
+        # published again on the next refresh.
+        stamps = _source_stamps()
+        generation = self.generation + 1
+        raw = encode_snapshot(
+            generation,
+            [(h.id, h.name) for h in Hotel.all()],
+            [(c.id, c.name) for c in Customer.all()],
+        )
+        snapshot = _create(f"{self.name}-{generation}", len(raw))
+        snapshot.buf[:len(raw)] = raw
+        CONTROL.pack_into(self._control.buf, 0, generation)
+        if self._snapshot is not None:
+            _unlink(self._snapshot)
+        self._snapshot = snapshot
+        self._stamps = stamps
+        self.generation = generation
+
+    def close(self):
+        """Stop following changes and remove the shared segments."""
+        self._watcher.stop()
+        with self._lock:
+            for segment in (self._snapshot, self._control):
+                if segment is not None:
+                    _unlink(segment)
+            self._snapshot = self._control = None
+
+    def __enter__(self):
+        """Start publishing for the duration of a with block."""
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        """Remove the directory when leaving a with block."""
+        self.close()
+
+
+class SharedDirectory:
+    """Resolves hotel and customer ids from a published directory."""
+
+    def __init__(self, name=DEFAULT_NAME):
+        """Attach to the directory called name."""
+        self.name = name
+        self._control = _attach(f"{name}-ctl")
+        self._snapshot = None
+        self._counts = (0, 0)
+        self.generation = 0
+
+    def _refresh(self):
+        """Reattach if the publisher has advanced the generation."""
+        for _ in range(ATTACH_RETRIES):
+            (generation,) = CONTROL.unpack_from(self._control.buf, 0)
+            if generation == self.generation:
+                break
+            try:
+                snapshot = _attach(f"{self.name}-{generation}")
+            except FileNotFoundError:
+                continue  # superseded before we attached; read again
+            magic, stored, hotels, customers = HEADER.unpack_from(
+                snapshot.buf, 0
+            )
+            if magic != MAGIC or stored != generation:
+                snapshot.close()
+                raise ValueError(f"Corrupt shared directory {self.name}")
+            if self._snapshot is not None:
+                self._snapshot.close()
+            self._snapshot = snapshot
+            self._counts = (hotels, customers)
+            self.generation = generation
+        if self._snapshot is None:
+            raise ValueError(f"Shared directory {self.name} is unavailable")
+
+    def _lookup(self, table, record_id):
+        """Return the name stored for record_id in a table, or None."""
+        self._refresh()
+        hotels, customers = self._counts
+        start, count = (0, hotels) if table == 'hotel' else (
+            hotels, customers
+        )
+        return _search(self._snapshot.buf, start, count,
+                       record_id.encode('utf-8'))
+
+    def find_hotel(self, hotel_id):
+        """Return the Hotel with an id. Raises ValueError if missing."""
+        name = self._lookup('hotel', hotel_id)
+        if name is None:
+            raise ValueError(f"Hotel {hotel_id} not found")
+        return Hotel(hotel_id=hotel_id, name=name)
+
+    def find_customer(self, customer_id):
+        """Return the Customer with an id. Raises ValueError if missing."""
+        name = self._lookup('customer', customer_id)
+        if name is None:
+            raise ValueError(f"Customer {customer_id} not found")
+        return Customer(customer_id=customer_id, name=name)
+
+    def close(self):
+        """Detach from the shared segments."""
+        for segment in (self._snapshot, self._control):
+            if segment is not None:
+                segment.close()
+        self._snapshot = self._control = None
+
+    def __enter__(self):
+        """Return the directory for use in a with statement."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Detach when leaving a with statement."""
+        self.close()
@@ -0,0 +1,166 @@
+"""Materialized per-hotel reservation statistics."""
+from collections import Counter
+from datetime import date, timedelta
+from functools import partial
+from src.storage import list_files, load, locked, save
+
+STATS_DIR = 'stats'
+# Statistics are a single object rather than a list of records, which
+# codec detection cannot tell apart from JSON lines, so pin the codec.
+STATS_CODEC = 'json'
+
+
+def stats_file(hotel_id):
+    """Return the data file holding a hotel's statistics."""
+    return f"{STATS_DIR}/{hotel_id}.json"
+
+
+def _empty():
+    """Return statistics for a hotel without reservations."""
+    return {"active": 0, "cancelled": 0, "room_nights": {}}
+
+
+def room_nights_by_month(check_in, check_out):
+    """
+    Count the nights of a stay per month, keyed by "YYYY-MM".
+
+    A night belongs to the month of its date, so a stay crossing a
+    month boundary is split. Returns an empty dict for unparsable or
+    empty date ranges.
+    """
+    try:
+        day = date.fromisoformat(check_in)
+        end = date.fromisoformat(check_out)
+    except (TypeError, ValueError):
+        return {}
+    nights = Counter()
+    while day < end:
+        nights[day.strftime('%Y-%m')] += 1
+        day += timedelta(days=1)
+    return dict(nights)
+
+
+def _add_nights(stats, record, sign):
+    """Add (sign=1) or remove (sign=-1) a reservation's room-nights."""
+    totals = stats["room_nights"]
+    nights = room_nights_by_month(record["check_in"], record["check_out"])
+    for month, count in nights.items():
+        totals[month] = totals.get(month, 0) + sign * count
+        if not totals[month]:
+            del totals[month]
+
+
+def _tally(stats, record):
+    """Count one stored reservation record into stats."""
+    if record["status"] == "cancelled":
+        stats["cancelled"] += 1
+    else:
+        stats["active"] += 1
+        _add_nights(stats, record, 1)
+
+
+def _count_created(records, stats):
+    """Add newly created active reservations to stats."""
+    for record in records:
+        stats["active"] += 1
+        _add_nights(stats, record, 1)
+
+
+def _count_cancelled(record, stats):
+    """Move a cancelled reservation from active to cancelled in stats."""
+    stats["active"] -= 1
+    stats["cancelled"] += 1
+    _add_nights(stats, record, -1)
+
+
+def _reservation_module():
+    """Return src.reservation, which imports this module itself."""
+    # pylint: disable-next=import-outside-toplevel,cyclic-import
+    from src import reservation
+    return reservation
+
+
+def _rebuild_hotel(hotel_id):
+    """Recompute one hotel's statistics from its reservation partitions."""
+    model = _reservation_module().Reservation
+    stats = _empty()
+    for reservation in model.iter_all(model.partitions(hotel_id)):
+        if reservation.hotel_id == hotel_id:
+            _tally(stats, reservation.to_record())
+    return stats
+
+
+def _update(hotel_id, change):
+    """
+    Apply change(stats) to a hotel's statistics under the file's lock.
+
+    Callers hold the hotel's reservation lock and have already saved
+    the partition. A hotel without a statistics file, such as one
+    whose reservations predate them, is rebuilt from its partitions
+    instead, which already include the change.
+    """
+    with locked(stats_file(hotel_id)):
+        stats = load(stats_file(hotel_id), codec=STATS_CODEC)
+        if stats:
+            change(stats)
+        else:
+            stats = _rebuild_hotel(hotel_id)
+        save(stats_file(hotel_id), stats, codec=STATS_CODEC)
+
+
+def get(hotel_id):
+    """
+    Return the materialized statistics for a hotel.
+
+    Hotels without a statistics file are rebuilt from their
+    reservation partitions and the result is saved, holding the
+    hotel's reservation lock so no booking is counted twice.
+    """
+    stats = load(stats_file(hotel_id), codec=STATS_CODEC)
+    if stats:
+        return stats
+    with _reservation_module().locked_hotel(hotel_id), \
+            locked(stats_file(hotel_id)):
+        stats = load(stats_file(hotel_id), codec=STATS_CODEC)
+        if not stats:
+            stats = _rebuild_hotel(hotel_id)
+            save(stats_file(hotel_id), stats, codec=STATS_CODEC)
+        return stats
+
+
+def record_created(record):
+    """Count a newly created active reservation."""
+    record_created_many([record])
+
+
+def record_created_many(records):
+    """Count newly created reservations with one write per hotel."""
+    by_hotel = {}
+    for record in records:
+        by_hotel.setdefault(record["hotel_id"], []).append(record)
+    for hotel_id, hotel_records in by_hotel.items():
+        _update(hotel_id, partial(_count_created, hotel_records))
+
+
+def record_cancelled(record):
+    """Move a reservation from the active to the cancelled count."""
+    _update(record["hotel_id"], partial(_count_cancelled, record))
+
+
+def rebuild(records):
+    """
+    Recompute every hotel's statistics from reservation records.
+
+    Statistics of hotels that no longer have reservations are reset.
+    Returns a dict mapping hotel ids to their new statistics.
+    """
+    rebuilt = {}
+    for record in records:
+        _tally(rebuilt.setdefault(record["hotel_id"], _empty()), record)
+    for filename in list_files(STATS_DIR):
+        hotel_id = filename[len(STATS_DIR) + 1:-len('.json')]
+        if hotel_id not in rebuilt:
+            save(filename, _empty(), codec=STATS_CODEC)
+    for hotel_id, stats in rebuilt.items():
+        save(stats_file(hotel_id), stats, codec=STATS_CODEC)
+    return rebuilt
@@ -1,34 +1,305 @@
-"""Shared JSON persistence utilities."""
+"""Shared persistence utilities with pluggable serialization codecs."""
+import contextlib
+import contextvars
 import json
+import marshal
 import os
+import threading
+from collections import namedtuple
+from src.backends import FileBackend, MemoryBackend
 
+# Default location of data files; overridden by $HOTEL_DATA_DIR.
 DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+DATA_DIR_ENV = 'HOTEL_DATA_DIR'
 
+Codec = namedtuple('Codec', ['encode', 'decode'])
 
-def load(filename):
+MARSHAL_MAGIC = b'HRMARSH1'
+
+
+def _encode_json_pretty(data):
+    """Encode data as indented JSON, convenient for debugging."""
+    return json.dumps(data, indent=2).encode('utf-8')
+
+
+def _encode_json(data):
+    """Encode data as JSON without insignificant whitespace."""
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+
+def _decode_json(raw):
+    """Decode a JSON document."""
+    return json.loads(raw.decode('utf-8'))
+
+
+def _encode_jsonl(data):
+    """Encode a list as JSON lines, one compact record per line."""
+    return b''.join(_encode_json(record) + b'\n' for record in data)
+
+
+def _decode_jsonl(raw):
+    """Decode JSON lines into a list, ignoring blank lines."""
+    return [
+        json.loads(line)
+        for line in raw.decode('utf-8').splitlines() if line.strip()
+    ]
+
+
+def _encode_marshal(data):
+    """Encode data with marshal behind a magic header."""
+    return MARSHAL_MAGIC + marshal.dumps(data)
+
+
+def _decode_marshal(raw):
+    """Decode data written by _encode_marshal."""
+    return marshal.loads(raw[len(MARSHAL_MAGIC):])
+
+
+CODECS = {
+    'json-pretty': Codec(_encode_json_pretty, _decode_json),
+    'json': Codec(_encode_json, _decode_json),
+    'jsonl': Codec(_encode_jsonl, _decode_jsonl),
+    'marshal': Codec(_encode_marshal, _decode_marshal),
+}
+DEFAULT_CODEC = 'json'
+
+# Codec overrides keyed by filename or by a top-level subdirectory.
+_file_codecs = {}
+
+_cache_enabled = threading.Event()
+
+_context_backend = contextvars.ContextVar('backend', default=None)
+_default = {"backend": None}
+_file_backends = {}
+
+
+def data_dir():
+    """Return the default data directory, honoring $HOTEL_DATA_DIR."""
+    return os.environ.get(DATA_DIR_ENV) or DATA_DIR
+
+
+def current_backend():
+    """
+    Return the backend used by load() and save() in this context.
+
+    In order of precedence: the backend selected with use_backend() in
+    the current context, the one passed to configure(), a FileBackend
+    on $HOTEL_DATA_DIR, and finally a FileBackend on DATA_DIR.
+    """
+    backend = _context_backend.get() or _default["backend"]
+    if backend is None:
+        root = data_dir()
+        backend = _file_backends.setdefault(root, FileBackend(root))
+    return backend
+
+
+def configure(backend):
+    """Set the process-wide backend; None restores the default."""
+    _default["backend"] = backend
+
+
+@contextlib.contextmanager
+def use_backend(backend):
+    """
+    Use backend for storage calls made inside the with block.
+
+    The selection is held in a context variable, so concurrent threads
+    and asyncio tasks can each work on their own store. Threads started
+    inside the block do not inherit it unless run in a copied context.
+    """
+    token = _context_backend.set(backend)
+    try:
+        yield backend
+    finally:
+        _context_backend.reset(token)
+
+
+def use_data_dir(path):
+    """Store data files under path inside the with block."""
+    return use_backend(FileBackend(path))
+
+
+def use_memory():
+    """Store data files in a fresh in-memory store inside the with block."""
+    return use_backend(MemoryBackend())
+
+
+def enable_cache():
+    """
+    Keep decoded files in memory and reuse them while unchanged.
+
+    Entries are checked against the file's version (modification time
+    and size on disk) on every load, so writes by other processes are
+    still picked up. Entries are immutable marshal snapshots taken
+    after a successful write, and every load returns a fresh copy, so
+    callers may mutate loaded data freely.
+    """
+    _cache_enabled.set()
+
+
+def disable_cache():
+    """Stop caching decoded files and drop every cached entry."""
+    _cache_enabled.clear()
+    for backend in [_default["backend"], _context_backend.get(),
+                    *_file_backends.values()]:
+        if backend is not None:
+            backend.cache.clear()
+
+
+def set_codec(name, codec):
+    """
+    Select the codec used when saving a data file.
+
+    name is a filename such as 'hotels.json' or a subdirectory such as
+    'reservations', which applies to every file below it. Passing
+    None for codec restores the default. Raises ValueError for an
+    unknown codec.
+    """
+    if codec is None:
+        _file_codecs.pop(name, None)
+        return
+    if codec not in CODECS:
+        raise ValueError(f"Unknown codec {codec}")
+    _file_codecs[name] = codec
+
+
+def codec_for(filename):
+    """Return the name of the codec used to save filename."""
+    if filename in _file_codecs:
+        return _file_codecs[filename]
+    return _file_codecs.get(filename.split('/', 1)[0], DEFAULT_CODEC)
+
+
+def detect_codec(raw):
     """
-    Load data from a JSON file in the data directory.
+    Guess the codec that produced list data from its raw bytes.
+
+    Pretty and compact JSON share a decoder, so both report 'json'.
+    Content starting with an object is JSON lines, so files holding a
+    single object rather than a list must be loaded with an explicit
+    codec instead of relying on detection.
+    """
+    if raw.startswith(MARSHAL_MAGIC):
+        return 'marshal'
+    if raw.lstrip().startswith(b'{'):
+        return 'jsonl'
+    return 'json'
+
 
-    Returns an empty list if the file does not exist.
+def load(filename, codec=None):
     """
-    filepath = os.path.join(DATA_DIR, filename)
-    if not os.path.exists(filepath):
+    Load data from a file in the current backend.
+
+    The codec is detected from the file contents unless given. Returns
+    an empty list if the file does not exist or is corrupt.
+    """
+    backend = current_backend()
+    if not _cache_enabled.is_set():
+        return _read(backend, filename, codec)
+    version = backend.stamp(filename)
+    if version is None:
+        return []
+    cached = backend.cache.get(filename)
+    if cached is not None and cached[0] == version:
+        return marshal.loads(cached[1])
+    data = _read(backend, filename, codec)
+    backend.cache[filename] = (version, marshal.dumps(data))
+    return data
+
+
+def _read(backend, filename, codec=None):
+    """Read and decode a data file, reporting corrupt content."""
+    raw = backend.read(filename)
+    if raw is None or not raw.strip():
         return []
+    codec = codec or detect_codec(raw)
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except json.JSONDecodeError as e:
+        return CODECS[codec].decode(raw)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
         print(f"Error: Corrupt JSON in {filename}: {e}")
-        return []
+    except (EOFError, ValueError, TypeError) as e:
+        print(f"Error: Corrupt {codec} data in {filename}: {e}")
+    return []
+
+
+def save(filename, data, codec=None):
+    """
+    Save data to a file in the current backend.
+
+    Uses codec if given, otherwise the one selected for the file with
+    set_codec().
+    """
+    backend = current_backend()
+    backend.write(filename, CODECS[codec or codec_for(filename)].encode(data))
+    if _cache_enabled.is_set():
+        backend.cache[filename] = (backend.stamp(filename),
+                                   marshal.dumps(data))
 
 
-def save(filename, data):
+def stamp(filename):
     """
-    Save data to a JSON file in the data directory.
+    Return a value identifying the current version of a data file.
 
-    Creates the data directory if needed.
+    The value changes whenever the file is written; None means the
+    file does not exist.
     """
-    os.makedirs(DATA_DIR, exist_ok=True)
-    filepath = os.path.join(DATA_DIR, filename)
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2)
+    return current_backend().stamp(filename)
+
+
+def locked(filename):
+    """
+    Return a context manager holding an exclusive lock on a data file.
+
+    With the file backend the lock is shared by every process using
+    the same data directory.
+    """
+    return current_backend().lock(filename)
+
+
+def list_files(dirname):
+    """
+    List the JSON files below a subdirectory of the data store.
+
+    Returned names are relative to the store, use forward slashes and
+    are sorted. Returns an empty list if the directory does not exist.
+    """
+    return current_backend().list(dirname)
+
+
+def append(filename, record):
+    """
+    Append one record as a compact JSON line to a data file.
+
+    Unlike save(), this never rewrites existing content, so it is
+    suited to append-only logs.
+    """
+    current_backend().append(filename, _encode_json(record) + b'\n')
+
+
+def iter_lines(filename, since=None):
+    """
+    Lazily yield the records of a JSON-lines data file.
+
+    since is an optional predicate that is false for the records at
+    the start of the file and true for the rest, such as a check on an
+    increasing sequence number. Records before the first one it holds
+    for are skipped with a binary search over the file instead of
+    being read.
+    """
+    backend = current_backend()
+    start = 0
+    if since is not None:
+        start = backend.find_line(
+            filename, lambda line: bool(line.strip()) and since(
+                json.loads(line)
+            )
+        )
+    for line in backend.iter_lines(filename, start):
+        if line.strip():
+            yield json.loads(line)
+
+
+def last_line(filename):
+    """Return the last record of a JSON-lines data file, or None."""
+    line = current_backend().last_line(filename)
+    return json.loads(line) if line else None
@@ -1,23 +1,16 @@
 """Shared fixtures for unit tests."""
-import os
-import glob
 import pytest
 from src.hotel import Hotel
 from src.customer import Customer
 from src.reservation import BookingInfo
-
-DATA_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'data')
+from src.storage import use_memory
 
 
 @pytest.fixture(autouse=True)
 def clean_data():
-    """Clean up all JSON data files before and after each test."""
-    os.makedirs(DATA_DIR, exist_ok=True)
-    for filepath in glob.glob(os.path.join(DATA_DIR, '*.json')):
-        os.remove(filepath)
-    yield
-    for filepath in glob.glob(os.path.join(DATA_DIR, '*.json')):
-        os.remove(filepath)
+    """Run each test against its own empty in-memory store."""
+    with use_memory() as backend:
+        yield backend
 
 
 @pytest.fixture
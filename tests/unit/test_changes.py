@@ -0,0 +1,147 @@
+"""Unit tests for the change feed."""
+import json
+import multiprocessing
+from contextlib import nullcontext
+import pytest
+from src import storage
+from src.changes import changes_since, publish, subscribe, unsubscribe
+from src.customer import Customer
+from src.hotel import Hotel
+from src.storage import append, last_line, use_data_dir
+
+
+def _publish_in_child(path, count):
+    """Publish changes from a separate process."""
+    with use_data_dir(path):
+        for i in range(count):
+            publish('hotel', 'update', str(i))
+
+
+class TestChangesSince:
+    """Tests for changes_since()."""
+
+    def test_empty_feed(self):
+        """Verify an empty feed has no changes."""
+        assert not changes_since(0)
+
+    def test_sequence_numbers_increase(self):
+        """Verify each change gets the next sequence number."""
+        hotel = Hotel.create(name="Four Seasons")
+        hotel.update(name="Hilton")
+        hotel.delete()
+        changes = changes_since(0)
+        assert [c["seq"] for c in changes] == [1, 2, 3]
+        assert [c["op"] for c in changes] == ["create", "update", "delete"]
+        assert changes[1]["data"] == {"name": "Hilton"}
+
+    def test_returns_only_newer_changes(self):
+        """Verify changes_since skips changes already consumed."""
+        Hotel.create(name="Four Seasons")
+        seq = changes_since(0)[-1]["seq"]
+        customer = Customer.create(name="Jon Doe")
+        changes = changes_since(seq)
+        assert len(changes) == 1
+        assert changes[0]["id"] == customer.id
+
+    def test_filters_by_entity(self):
+        """Verify changes_since can filter by entity."""
+        Hotel.create(name="Four Seasons")
+        Customer.create(name="Jon Doe")
+        assert [c["entity"] for c in changes_since(0, "customer")] == [
+            "customer"
+        ]
+
+    def test_sequence_unique_across_processes(self, tmp_path):
+        """Verify concurrent processes never reuse a sequence number."""
+        context = multiprocessing.get_context('fork')
+        workers = [
+            context.Process(target=_publish_in_child,
+                            args=(str(tmp_path), 50))
+            for _ in range(4)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        with use_data_dir(str(tmp_path)):
+            seqs = [c["seq"] for c in changes_since(0)]
+        assert sorted(seqs) == list(range(1, 201))
+
+    @pytest.mark.parametrize('on_disk', [False, True])
+    def test_every_starting_point(self, tmp_path, on_disk):
+        """Verify the binary search finds the first newer change."""
+        with use_data_dir(str(tmp_path)) if on_disk else nullcontext():
+            for i in range(40):
+                publish('hotel', 'update', 'x' * (i * 7 % 23), {"i": i})
+            for seq in range(42):
+                found = [c["seq"] for c in changes_since(seq)]
+                assert found == list(range(seq + 1, 41))
+
+    def test_decodes_only_newer_changes(self, monkeypatch):
+        """Verify older changes are skipped without being decoded."""
+        for i in range(1000):
+            publish('hotel', 'update', str(i))
+        decoded = []
+        real_loads = json.loads
+
+        def counting_loads(raw):
+            decoded.append(raw)
+            return real_loads(raw)
+        monkeypatch.setattr(storage.json, 'loads', counting_loads)
+        assert len(changes_since(995)) == 5
+        assert len(decoded) < 40
+
+    def test_reservation_create_and_cancel(self, sample_reservation_data):
+        """Verify reservation creation and cancellation are recorded."""
+        hotel, customer, info = sample_reservation_data
+        reservation = hotel.reserve_a_room(customer, info)
+        reservation.cancel_reservation()
+        changes = changes_since(0, "reservation")
+        assert [c["op"] for c in changes] == ["create", "cancel"]
+        assert changes[0]["data"]["room"] == "101"
+
+
+class TestSubscribe:
+    """Tests for subscribe() and unsubscribe()."""
+
+    def test_subscriber_receives_changes(self):
+        """Verify subscribers are called with each new change."""
+        received = []
+        subscribe(received.append)
+        try:
+            hotel = Hotel.create(name="Four Seasons")
+        finally:
+            unsubscribe(received.append)
+        Hotel.create(name="Hilton")
+        assert [c["id"] for c in received] == [hotel.id]
+
+    def test_failing_subscriber_does_not_break_writes(self, capsys):
+        """Verify a raising subscriber is reported and ignored."""
+        def fail(_):
+            raise RuntimeError("boom")
+        subscribe(fail)
+        try:
+            Hotel.create(name="Four Seasons")
+        finally:
+            unsubscribe(fail)
+        assert len(Hotel.all()) == 1
+        assert "Warning: Change subscriber failed" in capsys.readouterr().out
+
+    def test_unsubscribe_unknown_raises(self):
+        """Verify unsubscribing an unknown callback raises ValueError."""
+        with pytest.raises(ValueError):
+            unsubscribe(print)
+
+
+class TestLastLine:
+    """Tests for storage.last_line()."""
+
+    def test_returns_last_record(self):
+        """Verify the most recently appended record is returned."""
+        for i in range(3):
+            append('log.json', {"n": i})
+        assert last_line('log.json')["n"] == 2
+
+    def test_missing_file_returns_none(self):
+        """Verify a missing file has no last line."""
+        assert last_line('missing.json') is None
@@ -108,7 +108,7 @@ class TestCustomerUpdate:
 
 
 class TestCustomerFindById:
-    """Tests for Customer.find_by_id()."""
+    """Tests for Customer.find_by_id() and find_by_ids()."""
 
     def test_find_by_id_returns_customer(self):
         """Verify find_by_id returns the correct customer."""
@@ -122,3 +122,75 @@ class TestCustomerFindById:
         """Verify find_by_id raises ValueError for nonexistent id."""
         with pytest.raises(ValueError):
             Customer.find_by_id("nonexistent-id")
+
+    def test_find_by_ids_returns_found(self):
+        """Verify find_by_ids maps existing ids and skips missing ones."""
+        customer = Customer.create(name="Jon Doe")
+        found = Customer.find_by_ids([customer.id, "missing"])
+        assert list(found) == [customer.id]
+        assert found[customer.id].name == "Jon Doe"
+
+
+class TestCustomerGetOrCreate:
+    """Tests for Customer.get_or_create() and get_or_create_many()."""
+
+    def test_get_or_create_creates_missing(self):
+        """Verify get_or_create creates a customer when none matches."""
+        customer = Customer.get_or_create(name="Jon Doe")
+        assert Customer.find_by_id(customer.id).name == "Jon Doe"
+
+    def test_get_or_create_returns_existing(self):
+        """Verify get_or_create reuses a customer with the same name."""
+        existing = Customer.create(name="Jon Doe")
+        customer = Customer.get_or_create(name="  jon   DOE ")
+        assert customer.id == existing.id
+        assert len(Customer.all()) == 1
+
+    def test_get_or_create_many_deduplicates_batch(self):
+        """Verify repeated names in one batch resolve to one customer."""
+        customers = Customer.get_or_create_many(
+            ["Jon Doe", "Jane Doe", "jon doe"]
+        )
+        assert customers[0].id == customers[2].id
+        assert len(Customer.all()) == 2
+
+    def test_get_or_create_existing_skips_file_read(self, monkeypatch):
+        """Verify repeated lookups are served from the name index."""
+        existing = Customer.get_or_create(name="Jon Doe")
+        monkeypatch.setattr(
+            'src.customer.load', lambda _: pytest.fail("unexpected read")
+        )
+        assert Customer.get_or_create(name="JON DOE").id == existing.id
+
+    def test_get_or_create_sees_updates(self):
+        """Verify the name index is rebuilt after the file changes."""
+        customer = Customer.get_or_create(name="Jon Doe")
+        customer.update(name="Jane Doe")
+        assert Customer.get_or_create(name="jane doe").id == customer.id
+        assert Customer.get_or_create(name="Jon Doe").id != customer.id
+
+
+class TestCustomerMergeDuplicates:
+    """Tests for Customer.find_duplicates() and merge_duplicates()."""
+
+    def test_find_duplicates_does_not_write(self):
+        """Verify find_duplicates reports duplicates but keeps them."""
+        first = Customer.create(name="Jon Doe")
+        second = Customer.create(name="JON DOE")
+        assert Customer.find_duplicates() == {second.id: first.id}
+        assert len(Customer.all()) == 2
+
+    def test_merge_keeps_first_record(self):
+        """Verify duplicates are merged into the first created customer."""
+        first = Customer.create(name="Jon Doe")
+        second = Customer.create(name="JON DOE")
+        Customer.create(name="Jane Doe")
+        merged = Customer.merge_duplicates()
+        assert merged == {second.id: first.id}
+        assert [c.id for c in Customer.all()][0] == first.id
+        assert len(Customer.all()) == 2
+
+    def test_merge_without_duplicates_is_noop(self):
+        """Verify merge_duplicates returns an empty mapping when clean."""
+        Customer.create(name="Jon Doe")
+        assert not Customer.merge_duplicates()
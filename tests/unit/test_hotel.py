@@ -1,7 +1,12 @@
 """Unit tests for Hotel."""
+import contextvars
+import threading
 import pytest
+from src import reservation as reservation_module
+from src.customer import Customer
 from src.hotel import Hotel
-from src.reservation import Reservation
+from src.reservation import BookingInfo, Reservation
+from src.storage import use_data_dir
 
 
 class TestHotelCreate:
@@ -109,7 +114,7 @@ class TestHotelUpdate:
 
 
 class TestHotelFindById:
-    """Tests for Hotel.find_by_id()."""
+    """Tests for Hotel.find_by_id() and find_by_ids()."""
 
     def test_find_by_id_returns_hotel(self):
         """Verify find_by_id returns the correct hotel."""
@@ -124,6 +129,14 @@ class TestHotelFindById:
         with pytest.raises(ValueError):
             Hotel.find_by_id("nonexistent-id")
 
+    def test_find_by_ids_returns_found(self):
+        """Verify find_by_ids maps existing ids and skips missing ones."""
+        hotel = Hotel.create(name="Four Seasons")
+        Hotel.create(name="Hilton")
+        found = Hotel.find_by_ids([hotel.id, "missing"])
+        assert list(found) == [hotel.id]
+        assert found[hotel.id].name == "Four Seasons"
+
 
 class TestHotelReserveARoom:
     """Tests for Hotel.reserve_a_room()."""
@@ -166,3 +179,138 @@ class TestHotelCancelAReservation:
         hotel.cancel_a_reservation(reservation)
         found = Reservation.find_by_id(reservation.id)
         assert found.status == "cancelled"
+
+
+class TestHotelReserveRooms:
+    """Tests for Hotel.reserve_rooms()."""
+
+    def test_reserve_rooms_creates_all(self, sample_reservation_data):
+        """Verify every requested room is reserved."""
+        hotel, customer, _ = sample_reservation_data
+        infos = [
+            BookingInfo("2026-03-01", "2026-03-05", str(room))
+            for room in range(101, 111)
+        ]
+        reservations = hotel.reserve_rooms(customer, infos)
+        assert len(reservations) == 10
+        assert len(Reservation.all()) == 10
+        assert hotel.stats()["active"] == 10
+
+    def test_conflict_with_existing_books_nothing(self,
+                                                  sample_reservation_data):
+        """Verify a clash with an active booking rolls back the group."""
+        hotel, customer, info = sample_reservation_data
+        hotel.reserve_a_room(customer, info)
+        group = [
+            BookingInfo("2026-03-01", "2026-03-05", "102"),
+            BookingInfo("2026-03-04", "2026-03-06", "101"),
+        ]
+        with pytest.raises(ValueError, match="room 101"):
+            hotel.reserve_rooms(customer, group)
+        assert len(Reservation.all()) == 1
+        assert hotel.stats()["active"] == 1
+
+    def test_conflict_within_group(self, sample_reservation_data):
+        """Verify overlapping bookings in the same request are rejected."""
+        hotel, customer, info = sample_reservation_data
+        with pytest.raises(ValueError, match="requested twice"):
+            hotel.reserve_rooms(customer, [info, info])
+        assert not Reservation.all()
+
+    def test_adjacent_and_cancelled_do_not_conflict(self,
+                                                    sample_reservation_data):
+        """Verify back-to-back stays and cancelled bookings are allowed."""
+        hotel, customer, info = sample_reservation_data
+        hotel.reserve_a_room(customer, info).cancel_reservation()
+        hotel.reserve_a_room(
+            customer, BookingInfo("2026-02-25", "2026-03-01", "101")
+        )
+        assert len(hotel.reserve_rooms(customer, [info])) == 1
+
+    def test_other_hotels_do_not_conflict(self, sample_reservation_data):
+        """Verify the same room number at another hotel is independent."""
+        hotel, customer, info = sample_reservation_data
+        Hotel.create(name="Hilton").reserve_a_room(customer, info)
+        assert len(hotel.reserve_rooms(customer, [info])) == 1
+
+    def test_invalid_dates_raise(self, sample_reservation_data):
+        """Verify a booking ending before it starts is rejected."""
+        hotel, customer, _ = sample_reservation_data
+        with pytest.raises(ValueError, match="check_out"):
+            hotel.reserve_rooms(
+                customer, [BookingInfo("2026-03-05", "2026-03-01", "101")]
+            )
+
+    def test_failed_write_restores_partitions(self, sample_reservation_data,
+                                              monkeypatch):
+        """Verify partitions written before a failure are restored."""
+        monkeypatch.setattr(reservation_module, 'PARTITION_BY_MONTH', True)
+        hotel, customer, _ = sample_reservation_data
+        real_save = reservation_module.save
+
+        def failing_save(filename, data):
+            if filename.endswith('2026-04.json'):
+                raise OSError("disk full")
+            real_save(filename, data)
+
+        monkeypatch.setattr(reservation_module, 'save', failing_save)
+        with pytest.raises(OSError):
+            hotel.reserve_rooms(customer, [
+                BookingInfo("2026-03-01", "2026-03-05", "101"),
+                BookingInfo("2026-04-01", "2026-04-05", "101"),
+            ])
+        assert not Reservation.all()
+
+    def test_rollback_keeps_other_writers_records(self,
+                                                  sample_reservation_data,
+                                                  monkeypatch):
+        """Verify a rollback removes only the records it added."""
+        monkeypatch.setattr(reservation_module, 'PARTITION_BY_MONTH', True)
+        hotel, customer, _ = sample_reservation_data
+        real_save = reservation_module.save
+        march = reservation_module.partition_for(hotel.id, "2026-03-01")
+        other = {
+            "id": "other", "hotel_id": hotel.id, "customer_id": customer.id,
+            "check_in": "2026-03-10", "check_out": "2026-03-12",
+            "room": "102", "status": "active",
+        }
+
+        def failing_save(filename, data):
+            if filename.endswith('2026-04.json'):
+                real_save(march, reservation_module.load(march) + [other])
+                raise OSError("disk full")
+            real_save(filename, data)
+
+        monkeypatch.setattr(reservation_module, 'save', failing_save)
+        with pytest.raises(OSError):
+            hotel.reserve_rooms(customer, [
+                BookingInfo("2026-03-01", "2026-03-05", "101"),
+                BookingInfo("2026-04-01", "2026-04-05", "101"),
+            ])
+        assert [r.id for r in Reservation.all()] == ["other"]
+
+    def test_concurrent_bookings_of_the_same_rooms(self, tmp_path):
+        """Verify one of several racing bookings of each room succeeds."""
+        with use_data_dir(str(tmp_path)):
+            hotel = Hotel.create(name="Four Seasons")
+            customer = Customer.create(name="Jon Doe")
+            booked = []
+
+            def book(room):
+                info = BookingInfo("2026-03-01", "2026-03-05", str(room))
+                try:
+                    booked.append(hotel.reserve_rooms(customer, [info]))
+                except ValueError:
+                    pass
+            threads = [
+                threading.Thread(target=contextvars.copy_context().run,
+                                 args=(book, room))
+                for room in range(10) for _ in range(4)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert len(booked) == 10
+            assert len(Reservation.all()) == 10
+            assert hotel.stats()["active"] == 10
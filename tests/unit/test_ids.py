@@ -0,0 +1,103 @@
+"""Unit tests for id strategies."""
+import time
+from datetime import datetime, timedelta, timezone
+import pytest
+from src import ids
+from src.hotel import Hotel
+from src.reservation import Reservation
+from src.storage import load, save
+
+
+@pytest.fixture
+def ulid_strategy():
+    """Generate ULIDs for the duration of a test."""
+    ids.set_strategy('ulid')
+    yield
+    ids.set_strategy('uuid4')
+
+
+class TestIdStrategies:
+    """Tests for id generation."""
+
+    def test_default_is_uuid4(self):
+        """Verify the default strategy keeps generating UUIDs."""
+        assert len(Hotel.create(name="Four Seasons").id) == 36
+
+    def test_ulid_strategy(self, ulid_strategy):
+        """Verify models get compact ULIDs under the ulid strategy."""
+        # pylint: disable=unused-argument,redefined-outer-name
+        hotel = Hotel.create(name="Four Seasons")
+        assert ids.is_ulid(hotel.id)
+        assert Hotel.find_by_id(hotel.id).name == "Four Seasons"
+
+    def test_ulids_sort_by_creation(self):
+        """Verify ULIDs generated in sequence are strictly increasing."""
+        generated = [ids.new_ulid() for _ in range(1000)]
+        assert generated == sorted(generated)
+        assert len(set(generated)) == 1000
+
+    def test_ulid_waits_when_random_part_overflows(self, monkeypatch):
+        """Verify an exhausted random part moves to the next millisecond."""
+        # pylint: disable=protected-access
+        ms = time.time_ns() // 1_000_000 + 5
+        last = (1 << 80) - 1
+        monkeypatch.setitem(ids._last, "ms", ms)
+        monkeypatch.setitem(ids._last, "random", last)
+        ulid = ids.new_ulid()
+        assert ulid > ids._encode((ms << 80) | last)
+        assert ids.timestamp_of(ulid) > datetime.fromtimestamp(
+            ms / 1000, timezone.utc
+        )
+
+    def test_timestamp_of(self):
+        """Verify the creation time is recovered from a ULID."""
+        before = datetime.now(timezone.utc) - timedelta(seconds=1)
+        assert ids.timestamp_of(ids.new_ulid()) >= before
+        assert ids.timestamp_of("not-a-ulid") is None
+
+    def test_unknown_strategy_raises(self):
+        """Verify selecting an unknown strategy raises ValueError."""
+        with pytest.raises(ValueError):
+            ids.set_strategy('sequential')
+
+
+class TestCreatedSince:
+    """Tests for Reservation.created_since()."""
+
+    def test_returns_recent_reservations(self, sample_reservation_data,
+                                         ulid_strategy):
+        """Verify only reservations created after the bound are returned."""
+        # pylint: disable=unused-argument,redefined-outer-name
+        hotel, customer, info = sample_reservation_data
+        old = hotel.reserve_a_room(customer, info)
+        since = ids.timestamp_of(old.id) + timedelta(milliseconds=1)
+        new = hotel.reserve_a_room(customer, info)
+        while ids.timestamp_of(new.id) < since:
+            new = hotel.reserve_a_room(customer, info)
+        found = Reservation.created_since(since)
+        assert old.id not in [r.id for r in found]
+        assert found[-1].id == new.id
+
+    def test_finds_records_stored_out_of_order(self, sample_reservation_data,
+                                               ulid_strategy):
+        """Verify a newer id stored before an older one is still found."""
+        # pylint: disable=unused-argument,redefined-outer-name
+        hotel, customer, info = sample_reservation_data
+        old = hotel.reserve_a_room(customer, info)
+        since = ids.timestamp_of(old.id) + timedelta(milliseconds=1)
+        new = hotel.reserve_a_room(customer, info)
+        while ids.timestamp_of(new.id) < since:
+            new = hotel.reserve_a_room(customer, info)
+        partition = new.partition()
+        records = load(partition)
+        newest = next(r for r in records if r["id"] == new.id)
+        records.remove(newest)
+        save(partition, [newest] + records)
+        assert new.id in [r.id for r in Reservation.created_since(since)]
+
+    def test_skips_uuid4_reservations(self, sample_reservation_data):
+        """Verify reservations without a timestamp are not returned."""
+        hotel, customer, info = sample_reservation_data
+        hotel.reserve_a_room(customer, info)
+        since = datetime.now(timezone.utc) - timedelta(days=1)
+        assert not Reservation.created_since(since)
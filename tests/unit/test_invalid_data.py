@@ -1,6 +1,5 @@
 """Unit tests for invalid file data handling."""
-import os
-from src.storage import DATA_DIR
+from src.storage import current_backend
 from src.hotel import Hotel
 from src.customer import Customer
 from src.reservation import Reservation
@@ -8,10 +7,7 @@ from src.reservation import Reservation
 
 def _write_raw(filename, content):
     """Write raw content to a data file."""
-    os.makedirs(DATA_DIR, exist_ok=True)
-    filepath = os.path.join(DATA_DIR, filename)
-    with open(filepath, 'w', encoding='utf-8') as f:
-        f.write(content)
+    current_backend().write(filename, content.encode('utf-8'))
 
 
 class TestCorruptJson:
@@ -1,6 +1,14 @@
 """Unit tests for Reservation."""
+import os
+import subprocess
+import sys
 import pytest
+from src import reservation as reservation_module
+from src.hotel import Hotel
 from src.reservation import Reservation
+from src.storage import load, save, use_data_dir
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
 
 
 class TestReservationCreate:
@@ -120,3 +128,156 @@ class TestReservationFindById:
         """Verify find_by_id raises ValueError for nonexistent id."""
         with pytest.raises(ValueError):
             Reservation.find_by_id("nonexistent-id")
+
+
+class TestReservationReassignCustomers:
+    """Tests for Reservation.reassign_customers()."""
+
+    def test_reassign_rewrites_customer_id(self, sample_reservation_data):
+        """Verify reservations of merged customers are repointed."""
+        hotel, customer, info = sample_reservation_data
+        reservation = Reservation.create_reservation(
+            customer=customer, hotel=hotel, booking_info=info
+        )
+        changed = Reservation.reassign_customers({customer.id: "other"})
+        assert changed == 1
+        assert Reservation.find_by_id(reservation.id).customer_id == "other"
+
+    def test_reassign_ignores_unmapped(self, sample_reservation_data):
+        """Verify reservations of other customers are left untouched."""
+        hotel, customer, info = sample_reservation_data
+        Reservation.create_reservation(
+            customer=customer, hotel=hotel, booking_info=info
+        )
+        assert Reservation.reassign_customers({"missing": "other"}) == 0
+
+
+class TestReservationPartitions:
+    """Tests for per-hotel (and per-month) reservation partitions."""
+
+    def test_create_writes_hotel_partition(self, sample_reservation_data):
+        """Verify a reservation is stored in its hotel's partition."""
+        hotel, customer, info = sample_reservation_data
+        Reservation.create_reservation(
+            customer=customer, hotel=hotel, booking_info=info
+        )
+        assert f"reservations/{hotel.id}.json" in Reservation.partitions()
+        assert not load('reservations.json')
+
+    def test_all_spans_hotels(self, sample_reservation_data):
+        """Verify all() fans out over every hotel partition."""
+        hotel, customer, info = sample_reservation_data
+        other = Hotel.create(name="Hilton")
+        Reservation.create_reservation(
+            customer=customer, hotel=hotel, booking_info=info
+        )
+        Reservation.create_reservation(
+            customer=customer, hotel=other, booking_info=info
+        )
+        assert len(Reservation.all()) == 2
+        assert len(Reservation.partitions(other.id)) == 2
+
+    def test_find_by_id_with_hotel_id(self, sample_reservation_data):
+        """Verify find_by_id only searches the given hotel's partitions."""
+        hotel, customer, info = sample_reservation_data
+        reservation = Reservation.create_reservation(
+            customer=customer, hotel=hotel, booking_info=info
+        )
+        found = Reservation.find_by_id(reservation.id, hotel_id=hotel.id)
+        assert found.id == reservation.id
+        with pytest.raises(ValueError):
+            Reservation.find_by_id(reservation.id, hotel_id="other")
+
+    def test_month_partitioning(self, sample_reservation_data, monkeypatch):
+        """Verify month partitioning routes by check-in month."""
+        monkeypatch.setattr(reservation_module, 'PARTITION_BY_MONTH', True)
+        hotel, customer, info = sample_reservation_data
+        reservation = Reservation.create_reservation(
+            customer=customer, hotel=hotel, booking_info=info
+        )
+        assert reservation.partition() == (
+            f"reservations/{hotel.id}/2026-03.json"
+        )
+        reservation.cancel_reservation()
+        assert Reservation.find_by_id(reservation.id).status == "cancelled"
+
+    def test_cancel_legacy_record(self):
+        """Verify records in the unpartitioned file can still be cancelled."""
+        save('reservations.json', [{
+            "id": "r1", "hotel_id": "h1", "customer_id": "c1",
+            "check_in": "2026-03-01", "check_out": "2026-03-05",
+            "room": "101", "status": "active",
+        }])
+        Reservation.find_by_id("r1").cancel_reservation()
+        assert Reservation.find_by_id("r1").status == "cancelled"
+
+
+class TestReservationRelations:
+    """Tests for lazy and prefetched hotel/customer relations."""
+
+    def test_lazy_hotel_and_customer(self, sample_reservation_data):
+        """Verify relations load on first access after a fresh read."""
+        hotel, customer, info = sample_reservation_data
+        reservation = Reservation.create_reservation(
+            customer=customer, hotel=hotel, booking_info=info
+        )
+        found = Reservation.find_by_id(reservation.id)
+        assert found.hotel.name == "Four Seasons"
+        assert found.customer.name == "Jon Doe"
+
+    def test_prefetch_reads_each_file_once(self, sample_reservation_data,
+                                           monkeypatch):
+        """Verify prefetching resolves all relations without more reads."""
+        hotel, customer, info = sample_reservation_data
+        for _ in range(3):
+            Reservation.create_reservation(
+                customer=customer, hotel=hotel, booking_info=info
+            )
+        reservations = Reservation.all(prefetch=("hotel", "customer"))
+        monkeypatch.setattr(
+            'src.customer.load', lambda _: pytest.fail("unexpected read")
+        )
+        monkeypatch.setattr(
+            'src.hotel.load', lambda _: pytest.fail("unexpected read")
+        )
+        assert {r.hotel.name for r in reservations} == {"Four Seasons"}
+        assert {r.customer.name for r in reservations} == {"Jon Doe"}
+
+    def test_hotel_without_importing_hotel_module(self, tmp_path):
+        """Verify reservation.hotel works when only src.reservation is used."""
+        script = (
+            "import sys\n"
+            "from src.reservation import BookingInfo, Reservation\n"
+            "from src.storage import use_data_dir\n"
+            "assert 'src.hotel' not in sys.modules\n"
+            "with use_data_dir(sys.argv[1]):\n"
+            "    print(Reservation.find_by_id('r1').hotel.name)\n"
+        )
+        with use_data_dir(str(tmp_path)):
+            save('hotels.json', [{"id": "h1", "name": "Four Seasons"}])
+            save('reservations/h1.json', [{
+                "id": "r1", "hotel_id": "h1", "customer_id": "c1",
+                "check_in": "2026-03-01", "check_out": "2026-03-05",
+                "room": "101", "status": "active",
+            }])
+        result = subprocess.run(
+            [sys.executable, "-c", script, str(tmp_path)],
+            capture_output=True, text=True, check=True, cwd=ROOT,
+        )
+        assert result.stdout.strip() == "Four Seasons"
+
+    def test_prefetch_unknown_relation_raises(self):
+        """Verify prefetching an unknown relation raises ValueError."""
+        with pytest.raises(ValueError):
+            Reservation.all(prefetch=("room",))
+
+    def test_missing_hotel_raises_on_access(self, sample_reservation_data):
+        """Verify a dangling hotel reference raises ValueError."""
+        hotel, customer, info = sample_reservation_data
+        Reservation.create_reservation(
+            customer=customer, hotel=hotel, booking_info=info
+        )
+        hotel.delete()
+        reservation = Reservation.all(prefetch=("hotel",))[0]
+        with pytest.raises(ValueError):
+            _ = reservation.hotel
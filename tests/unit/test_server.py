@@ -0,0 +1,175 @@
+"""Unit tests for the reservation daemon and its client."""
+# pylint: disable=redefined-outer-name
+import contextlib
+import json
+import socket
+import threading
+import pytest
+from src.client import Client
+from src.hotel import Hotel
+from src.reservation import BookingInfo, Reservation
+from src.server import ReservationServer
+from src.storage import use_data_dir
+
+
+@contextlib.contextmanager
+def _serving(path, workers, **kwargs):
+    """Run a server on path in a background thread."""
+    server = ReservationServer(path, workers=workers, **kwargs)
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={'poll_interval': 0.01}
+    )
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+@pytest.fixture
+def client(tmp_path):
+    """Run a server on a temporary socket and return a client for it."""
+    path = str(tmp_path / 'hotel.sock')
+    with _serving(path, workers=4):
+        remote = Client(path, pool_size=2)
+        yield remote
+        remote.close()
+
+
+class TestServer:
+    """Tests for requests served over the Unix socket."""
+
+    def test_create_and_find_hotel(self, client):
+        """Verify hotels created remotely are persisted and found."""
+        hotel = client.hotels.create("Four Seasons")
+        assert client.hotels.find_by_id(hotel.id).name == "Four Seasons"
+        assert Hotel.find_by_id(hotel.id).name == "Four Seasons"
+
+    def test_reserve_and_cancel(self, client):
+        """Verify a remote booking can be listed and cancelled."""
+        hotel = client.hotels.create("Four Seasons")
+        customer = client.customers.create("Jon Doe")
+        info = BookingInfo("2026-03-01", "2026-03-05", "101")
+        reservation = hotel.reserve_a_room(customer, info)
+        assert [r.id for r in client.reservations.all()] == [reservation.id]
+        hotel.cancel_a_reservation(reservation)
+        assert reservation.status == "cancelled"
+        assert Reservation.find_by_id(reservation.id).status == "cancelled"
+
+    def test_reserve_rooms(self, client):
+        """Verify group bookings are all-or-nothing over the socket."""
+        hotel = client.hotels.create("Four Seasons")
+        customer = client.customers.create("Jon Doe")
+        infos = [
+            BookingInfo("2026-03-01", "2026-03-05", "101"),
+            BookingInfo("2026-03-01", "2026-03-05", "102"),
+        ]
+        assert len(hotel.reserve_rooms(customer, infos)) == 2
+        with pytest.raises(ValueError, match="unavailable"):
+            hotel.reserve_rooms(customer, infos)
+        assert len(client.reservations.all()) == 2
+
+    def test_not_found_raises_value_error(self, client):
+        """Verify server-side ValueErrors surface as ValueError."""
+        with pytest.raises(ValueError, match="not found"):
+            client.customers.find_by_id("missing")
+
+    def test_unknown_operation_raises(self, client):
+        """Verify unknown operations are rejected."""
+        with pytest.raises(ValueError, match="Unknown operation"):
+            client.call("hotel.explode")
+
+    def test_concurrent_clients(self, client):
+        """Verify concurrent writes through the pool are all applied."""
+        threads = [
+            threading.Thread(
+                target=client.hotels.create, args=(f"Hotel {i}",)
+            )
+            for i in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(client.hotels.all()) == 8
+
+    def test_idle_connections_do_not_hold_workers(self, tmp_path):
+        """Verify more open connections than workers are all served."""
+        path = str(tmp_path / 'hotel.sock')
+        with _serving(path, workers=2):
+            clients = [Client(path, pool_size=1) for _ in range(3)]
+            for remote in clients[:2]:
+                remote.hotels.create("Four Seasons")
+            result = []
+            thread = threading.Thread(
+                target=lambda: result.append(clients[2].hotels.all()),
+                daemon=True,
+            )
+            thread.start()
+            thread.join(timeout=5)
+            served = list(result)
+            for remote in clients:
+                remote.close()
+        assert len(served) == 1 and len(served[0]) == 2
+
+    def test_reads_during_writes_see_whole_files(self, tmp_path):
+        """Verify readers never see a partly written data file."""
+        path = str(tmp_path / 'hotel.sock')
+        failures = []
+        done = threading.Event()
+        with use_data_dir(str(tmp_path / 'data')), \
+                _serving(path, workers=4), \
+                Client(path, pool_size=5) as remote:
+            first = remote.hotels.create("Hotel 0")
+
+            def read():
+                while not done.is_set():
+                    try:
+                        remote.hotels.find_by_id(first.id)
+                        if not remote.hotels.all():
+                            failures.append("empty listing")
+                    except ValueError as e:
+                        failures.append(str(e))
+            readers = [threading.Thread(target=read) for _ in range(4)]
+            for reader in readers:
+                reader.start()
+            for i in range(1, 100):
+                remote.hotels.create(f"Hotel {i}")
+            done.set()
+            for reader in readers:
+                reader.join()
+            assert len(remote.hotels.all()) == 100
+        assert not failures
+
+    def test_lookups_served_from_memory(self, client, monkeypatch):
+        """Verify repeated lookups do not read the data files again."""
+        hotel = client.hotels.create("Four Seasons")
+        client.hotels.find_by_id(hotel.id)
+        monkeypatch.setattr(
+            'src.hotel.load', lambda _: pytest.fail("unexpected read")
+        )
+        assert client.hotels.find_by_id(hotel.id).name == "Four Seasons"
+        assert [h.name for h in client.hotels.all()] == ["Four Seasons"]
+
+    def test_picks_up_writes_by_other_processes(self, tmp_path):
+        """Verify files changed outside the daemon are reloaded."""
+        path = str(tmp_path / 'hotel.sock')
+        with _serving(path, workers=2, max_age=0), \
+                Client(path, pool_size=1) as remote:
+            assert not remote.hotels.all()
+            hotel = Hotel.create(name="Four Seasons")
+            assert remote.hotels.find_by_id(hotel.id).name == "Four Seasons"
+
+    def test_unexpected_error_still_answered(self, tmp_path):
+        """Verify requests failing with any exception get a reply."""
+        path = str(tmp_path / 'hotel.sock')
+        with _serving(path, workers=1), \
+                socket.socket(socket.AF_UNIX) as sock:
+            sock.settimeout(5)
+            sock.connect(path)
+            sock.sendall(b'[' * 100000 + b'\n')
+            reply = json.loads(sock.makefile('rb').readline())
+        assert not reply["ok"]
+        assert reply["error"].startswith("RecursionError")
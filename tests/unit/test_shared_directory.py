@@ -0,0 +1,131 @@
+"""Unit tests for the shared memory hotel and customer directory."""
+import multiprocessing
+import time
+import uuid
+import pytest
+from src.customer import Customer
+from src.hotel import Hotel
+from src.shared_directory import DirectoryPublisher, SharedDirectory
+from src.storage import use_data_dir
+
+
+def _hotel_name_in_child(name, hotel_id):
+    """Resolve a hotel from a separate process."""
+    with SharedDirectory(name) as directory:
+        return directory.find_hotel(hotel_id).name
+
+
+def _create_hotel_in_child(path, name):
+    """Create a hotel from a separate process and return its id."""
+    with use_data_dir(path):
+        return Hotel.create(name=name).id
+
+
+def _wait_for_generation(pub, generation, timeout=5):
+    """Wait until pub has published the given generation."""
+    deadline = time.monotonic() + timeout
+    while pub.generation < generation:
+        assert time.monotonic() < deadline, "snapshot was not republished"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def publisher():
+    """Publish a uniquely named directory for the duration of a test."""
+    with DirectoryPublisher(f"hoteldir-{uuid.uuid4().hex[:8]}") as pub:
+        yield pub
+
+
+class TestSharedDirectory:
+    """Tests for DirectoryPublisher and SharedDirectory."""
+
+    def test_resolves_hotels_and_customers(self):
+        """Verify published ids resolve to their names."""
+        hotel = Hotel.create(name="Four Seasons")
+        customer = Customer.create(name="Jon Doe")
+        name = f"hoteldir-{uuid.uuid4().hex[:8]}"
+        with DirectoryPublisher(name), SharedDirectory(name) as directory:
+            assert directory.find_hotel(hotel.id).name == "Four Seasons"
+            assert directory.find_customer(customer.id).name == "Jon Doe"
+
+    def test_missing_id_raises(self, publisher):
+        """Verify unknown ids raise ValueError."""
+        # pylint: disable=redefined-outer-name
+        with SharedDirectory(publisher.name) as directory:
+            with pytest.raises(ValueError):
+                directory.find_hotel("missing")
+
+    def test_changes_bump_generation(self, publisher):
+        """Verify creates, updates and deletes republish the directory."""
+        # pylint: disable=redefined-outer-name
+        with SharedDirectory(publisher.name) as directory:
+            hotel = Hotel.create(name="Four Seasons")
+            publisher.refresh()
+            assert directory.find_hotel(hotel.id).name == "Four Seasons"
+            hotel.update(name="Hilton")
+            publisher.refresh()
+            assert directory.find_hotel(hotel.id).name == "Hilton"
+            hotel.delete()
+            publisher.refresh()
+            with pytest.raises(ValueError):
+                directory.find_hotel(hotel.id)
+            assert directory.generation == publisher.generation == 4
+
+    def test_burst_of_changes_publishes_once(self):
+        """Verify changes between checks share a single snapshot."""
+        name = f"hoteldir-{uuid.uuid4().hex[:8]}"
+        with DirectoryPublisher(name, interval=60) as pub:
+            hotels = [Hotel.create(name=f"Hotel {i}") for i in range(5)]
+            assert pub.generation == 1
+            pub.refresh()
+            pub.refresh()
+            assert pub.generation == 2
+            with SharedDirectory(name) as directory:
+                assert directory.find_hotel(hotels[-1].id).name == "Hotel 4"
+
+    def test_republishes_after_interval(self):
+        """Verify changes are published without an explicit refresh."""
+        name = f"hoteldir-{uuid.uuid4().hex[:8]}"
+        with DirectoryPublisher(name, interval=0.01) as pub:
+            hotel = Hotel.create(name="Four Seasons")
+            _wait_for_generation(pub, 2)
+            with SharedDirectory(name) as directory:
+                assert directory.find_hotel(hotel.id).name == "Four Seasons"
+
+    def test_picks_up_changes_from_other_processes(self, tmp_path):
+        """Verify hotels created by a worker process are published."""
+        name = f"hoteldir-{uuid.uuid4().hex[:8]}"
+        context = multiprocessing.get_context('spawn')
+        with use_data_dir(str(tmp_path)), \
+                DirectoryPublisher(name, interval=0.01) as pub:
+            with context.Pool(1) as pool:
+                hotel_id = pool.apply(_create_hotel_in_child,
+                                      (str(tmp_path), "Four Seasons"))
+            _wait_for_generation(pub, 2)
+            with SharedDirectory(name) as directory:
+                assert directory.find_hotel(hotel_id).name == "Four Seasons"
+
+    def test_many_entries(self, publisher):
+        """Verify binary search finds every entry in a larger snapshot."""
+        # pylint: disable=redefined-outer-name
+        customers = Customer.get_or_create_many(
+            [f"Customer {i}" for i in range(200)]
+        )
+        publisher.refresh()
+        with SharedDirectory(publisher.name) as directory:
+            for customer in customers:
+                found = directory.find_customer(customer.id)
+                assert found.name == customer.name
+
+    def test_other_process_reads_directory(self, publisher):
+        """Verify a worker process resolves ids from shared memory."""
+        # pylint: disable=redefined-outer-name
+        hotel = Hotel.create(name="Four Seasons")
+        publisher.refresh()
+        context = multiprocessing.get_context('spawn')
+        with context.Pool(1) as pool:
+            name = pool.apply(_hotel_name_in_child,
+                              (publisher.name, hotel.id))
+        assert name == "Four Seasons"
+        with SharedDirectory(publisher.name) as directory:
+            assert directory.find_hotel(hotel.id).name == "Four Seasons"
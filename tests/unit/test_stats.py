@@ -0,0 +1,131 @@
+"""Unit tests for materialized reservation statistics."""
+import contextvars
+import threading
+from src.hotel import Hotel
+from src.reservation import BookingInfo, Reservation
+from src import stats
+from src.stats import room_nights_by_month
+from src.storage import save, use_data_dir
+
+
+class TestRoomNightsByMonth:
+    """Tests for room_nights_by_month()."""
+
+    def test_single_month(self):
+        """Verify a stay within one month counts its nights."""
+        assert room_nights_by_month("2026-03-01", "2026-03-05") == {
+            "2026-03": 4
+        }
+
+    def test_split_across_months(self):
+        """Verify a stay crossing months is split by night."""
+        assert room_nights_by_month("2026-03-30", "2026-04-02") == {
+            "2026-03": 2, "2026-04": 1
+        }
+
+    def test_invalid_dates(self):
+        """Verify unparsable dates count no nights."""
+        assert not room_nights_by_month("soon", "later")
+
+
+class TestHotelStats:
+    """Tests for incrementally maintained Hotel.stats()."""
+
+    def test_no_reservations(self):
+        """Verify a hotel without reservations has zero counts."""
+        hotel = Hotel.create(name="Four Seasons")
+        assert hotel.stats() == {
+            "active": 0, "cancelled": 0, "room_nights": {}
+        }
+
+    def test_create_counts_active(self, sample_reservation_data):
+        """Verify creating a reservation updates the counters."""
+        hotel, customer, info = sample_reservation_data
+        hotel.reserve_a_room(customer, info)
+        assert hotel.stats() == {
+            "active": 1, "cancelled": 0, "room_nights": {"2026-03": 4}
+        }
+
+    def test_cancel_moves_to_cancelled(self, sample_reservation_data):
+        """Verify cancelling moves the reservation between counters."""
+        hotel, customer, info = sample_reservation_data
+        hotel.reserve_a_room(customer, info).cancel_reservation()
+        assert hotel.stats() == {
+            "active": 0, "cancelled": 1, "room_nights": {}
+        }
+
+    def test_cancel_twice_counts_once(self, sample_reservation_data):
+        """Verify cancelling an already cancelled reservation is a no-op."""
+        hotel, customer, info = sample_reservation_data
+        reservation = hotel.reserve_a_room(customer, info)
+        reservation.cancel_reservation()
+        reservation.cancel_reservation()
+        assert hotel.stats()["cancelled"] == 1
+
+    def test_rebuild_matches_incremental(self, sample_reservation_data):
+        """Verify rebuilding from scratch yields the same counters."""
+        hotel, customer, info = sample_reservation_data
+        hotel.reserve_a_room(customer, info)
+        hotel.reserve_a_room(
+            customer, BookingInfo("2026-04-30", "2026-05-02", "102")
+        ).cancel_reservation()
+        incremental = hotel.stats()
+        save(f"stats/{hotel.id}.json", {"active": 99})
+        Reservation.rebuild_stats()
+        assert hotel.stats() == incremental
+
+    def test_rebuild_resets_stale_hotels(self, sample_reservation_data):
+        """Verify hotels without reservations are reset on rebuild."""
+        hotel, customer, info = sample_reservation_data
+        hotel.reserve_a_room(customer, info)
+        save(f"reservations/{hotel.id}.json", [])
+        Reservation.rebuild_stats()
+        assert hotel.stats()["active"] == 0
+
+    def test_missing_stats_rebuilt_before_cancel(self):
+        """Verify reservations stored before stats existed are counted."""
+        hotel = Hotel.create(name="Four Seasons")
+        save(f"reservations/{hotel.id}.json", [{
+            "id": "r1", "hotel_id": hotel.id, "customer_id": "c1",
+            "check_in": "2026-03-01", "check_out": "2026-03-05",
+            "room": "101", "status": "active",
+        }])
+        Reservation.find_by_id("r1").cancel_reservation()
+        assert hotel.stats() == {
+            "active": 0, "cancelled": 1, "room_nights": {}
+        }
+
+    def test_missing_stats_rebuilt_on_read(self):
+        """Verify reading stats for legacy reservations rebuilds them."""
+        hotel = Hotel.create(name="Four Seasons")
+        save("reservations.json", [{
+            "id": "r1", "hotel_id": hotel.id, "customer_id": "c1",
+            "check_in": "2026-03-01", "check_out": "2026-03-05",
+            "room": "101", "status": "active",
+        }])
+        assert hotel.stats()["active"] == 1
+
+    def test_concurrent_updates_are_not_lost(self, tmp_path):
+        """Verify concurrent counter updates are serialized."""
+        record = {"hotel_id": "h1", "check_in": "2026-03-01",
+                  "check_out": "2026-03-02"}
+        with use_data_dir(str(tmp_path)):
+            stats.get("h1")
+            threads = [
+                threading.Thread(
+                    target=contextvars.copy_context().run,
+                    args=(self._count_many, record),
+                )
+                for _ in range(8)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert stats.get("h1")["active"] == 400
+
+    @staticmethod
+    def _count_many(record):
+        """Count a reservation 50 times, one update at a time."""
+        for _ in range(50):
+            stats.record_created(record)
@@ -0,0 +1,195 @@
+"""Unit tests for storage codecs, backends and caching."""
+import os
+import threading
+import pytest
+from src import storage
+from src.backends import FileBackend
+from src.hotel import Hotel
+from src.storage import (
+    CODECS, current_backend, load, save, set_codec, use_data_dir,
+    use_memory,
+)
+
+RECORDS = [
+    {"id": "1", "name": "Four Seasons"},
+    {"id": "2", "name": "Hilton"},
+]
+
+
+@pytest.fixture(autouse=True)
+def reset_codecs():
+    """Restore default codec selection after each test."""
+    yield
+    storage._file_codecs.clear()  # pylint: disable=protected-access
+
+
+def _read_raw(filename):
+    """Read the raw bytes of a data file."""
+    return current_backend().read(filename)
+
+
+class TestCodecs:
+    """Tests for codec selection and detection."""
+
+    @pytest.mark.parametrize('codec', sorted(CODECS))
+    def test_round_trip(self, codec):
+        """Verify every codec loads back what it saved."""
+        set_codec('hotels.json', codec)
+        save('hotels.json', RECORDS)
+        assert load('hotels.json') == RECORDS
+
+    @pytest.mark.parametrize('codec', sorted(CODECS))
+    def test_detects_codec_on_load(self, codec):
+        """Verify load detects the codec without configuration."""
+        set_codec('hotels.json', codec)
+        save('hotels.json', RECORDS)
+        set_codec('hotels.json', None)
+        assert load('hotels.json') == RECORDS
+
+    @pytest.mark.parametrize('codec', ['json', 'json-pretty', 'marshal'])
+    def test_round_trip_dict_with_explicit_codec(self, codec):
+        """Verify object-valued files round-trip with a pinned codec."""
+        save('stats.json', {"active": 1}, codec=codec)
+        assert load('stats.json', codec=codec) == {"active": 1}
+
+    def test_detects_single_record_jsonl(self):
+        """Verify a one-record JSON lines file loads as a list."""
+        set_codec('hotels.json', 'jsonl')
+        hotel = Hotel.create(name="A")
+        set_codec('hotels.json', None)
+        assert load('hotels.json') == [{"id": hotel.id, "name": "A"}]
+        Hotel.create(name="B")
+        assert [h.name for h in Hotel.all()] == ["A", "B"]
+
+    def test_default_is_compact(self):
+        """Verify the default codec writes no indentation."""
+        save('hotels.json', RECORDS)
+        assert b'\n' not in _read_raw('hotels.json')
+
+    def test_directory_codec_applies_to_children(self):
+        """Verify a codec set on a subdirectory covers its files."""
+        set_codec('reservations', 'marshal')
+        save('reservations/h1.json', RECORDS)
+        raw = _read_raw('reservations/h1.json')
+        assert raw.startswith(storage.MARSHAL_MAGIC)
+
+    def test_unknown_codec_raises(self):
+        """Verify selecting an unknown codec raises ValueError."""
+        with pytest.raises(ValueError):
+            set_codec('hotels.json', 'xml')
+
+    def test_corrupt_marshal_returns_empty_list(self, capsys):
+        """Verify corrupt binary data is reported and ignored."""
+        current_backend().write('hotels.json', storage.MARSHAL_MAGIC + b'\xff')
+        assert load('hotels.json') == []
+        assert "Error: Corrupt marshal" in capsys.readouterr().out
+
+
+class TestLoadCache:
+    """Tests for storage.enable_cache()."""
+
+    @pytest.fixture(autouse=True)
+    def cache(self):
+        """Enable the load cache for each test in this class."""
+        storage.enable_cache()
+        yield
+        storage.disable_cache()
+
+    def test_cache_picks_up_saves(self):
+        """Verify cached loads reflect subsequent saves."""
+        Hotel.create(name="Four Seasons")
+        assert load('hotels.json') == load('hotels.json')
+        Hotel.create(name="Hilton")
+        assert len(Hotel.all()) == 2
+
+    def test_loads_return_independent_copies(self):
+        """Verify mutating loaded data does not change the cache."""
+        Hotel.create(name="Four Seasons")
+        load('hotels.json').append({"id": "x", "name": "Unsaved"})
+        assert len(Hotel.all()) == 1
+
+    def test_failed_write_is_not_visible(self, monkeypatch):
+        """Verify a save that raises leaves the cached data unchanged."""
+        Hotel.create(name="A")
+
+        def failing_write(*_):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(current_backend(), 'write', failing_write)
+        with pytest.raises(OSError):
+            Hotel.create(name="B")
+        assert [h.name for h in Hotel.all()] == ["A"]
+
+
+class TestBackends:
+    """Tests for backend selection."""
+
+    def test_use_data_dir_writes_files(self, tmp_path):
+        """Verify use_data_dir stores data files under the given path."""
+        with use_data_dir(str(tmp_path)):
+            Hotel.create(name="Four Seasons")
+        assert os.path.exists(tmp_path / 'hotels.json')
+        assert not Hotel.all()
+
+    def test_file_writes_are_atomic(self, tmp_path):
+        """Verify readers never see a partly written file."""
+        backend = FileBackend(str(tmp_path))
+        contents = [b'a' * 1_000_000, b'b' * 2_000_000]
+        backend.write('big.json', contents[0])
+        torn = []
+
+        def read():
+            for _ in range(200):
+                if backend.read('big.json') not in contents:
+                    torn.append(True)
+        reader = threading.Thread(target=read)
+        reader.start()
+        for i in range(200):
+            backend.write('big.json', contents[i % 2])
+        reader.join()
+        assert not torn
+        assert os.listdir(tmp_path) == ['big.json']
+
+    def test_memory_stores_are_isolated(self):
+        """Verify each in-memory store starts empty."""
+        Hotel.create(name="Four Seasons")
+        with use_memory():
+            assert not Hotel.all()
+        assert len(Hotel.all()) == 1
+
+    def test_env_var_selects_data_dir(self, tmp_path, monkeypatch):
+        """Verify $HOTEL_DATA_DIR sets the default data directory."""
+        monkeypatch.setenv(storage.DATA_DIR_ENV, str(tmp_path))
+        with storage.use_backend(None):
+            Hotel.create(name="Four Seasons")
+        assert os.path.exists(tmp_path / 'hotels.json')
+
+    def test_configure_sets_process_default(self, tmp_path):
+        """Verify configure() applies when no context backend is set."""
+        storage.configure(FileBackend(str(tmp_path)))
+        try:
+            with storage.use_backend(None):
+                Hotel.create(name="Four Seasons")
+        finally:
+            storage.configure(None)
+        assert os.path.exists(tmp_path / 'hotels.json')
+
+    def test_file_backend_last_line_across_chunks(self, tmp_path):
+        """Verify the last line is found when lines span read chunks."""
+        backend = FileBackend(str(tmp_path))
+        for i in range(50):
+            backend.append('log.json', f"{i:03d}{'x' * 100}\n".encode())
+        assert backend.last_line('log.json', chunk_size=16).startswith(
+            b'049'
+        )
+        assert backend.last_line('missing.json') is None
+
+    def test_file_backend_list(self, tmp_path):
+        """Verify list returns nested .json files relative to the root."""
+        backend = FileBackend(str(tmp_path))
+        backend.write('reservations/h1/2026-03.json', b'[]')
+        backend.write('reservations/h2.json', b'[]')
+        backend.write('reservations/notes.txt', b'')
+        assert backend.list('reservations') == [
+            'reservations/h1/2026-03.json', 'reservations/h2.json'
+        ]